@@ -1,11 +1,19 @@
 import os
+import atexit
+import hashlib
+import shlex
 import subprocess
-import requests
+import tempfile
+import time
+import functools
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
-from dotenv import load_dotenv
 import sys
 import re
-import textwrap
+import json
 
 # Configuración de formato para mensajes de commit
 COMMIT_FORMAT_CONFIG = {
@@ -30,18 +38,6 @@ COMMIT_FORMAT_CONFIG = {
             "wrap_length": 72
         }
     },
-    "commit_types": [
-        {"value": "feat", "name": "feat:     Una nueva característica", "description": "La nueva característica que agregas a una aplicación en particular"},
-        {"value": "fix", "name": "fix:      Un parche para un error", "description": "Un parche para un error"},
-        {"value": "style", "name": "style:    Características o actualizaciones relacionadas con estilos", "description": "Características o actualizaciones relacionadas con estilos"},
-        {"value": "refactor", "name": "refactor: Refactorizar una sección específica de la base de código", "description": "Refactorizar una sección específica de la base de código"},
-        {"value": "test", "name": "test:     Todo lo relacionado con pruebas", "description": "Todo lo relacionado con pruebas"},
-        {"value": "docs", "name": "docs:     Todo lo relacionado con documentación", "description": "Todo lo relacionado con documentación"},
-        {"value": "chore", "name": "chore:    Mantenimiento de código regular", "description": "Mantenimiento de código regular"},
-        {"value": "perf", "name": "perf:     Mejoras de rendimiento", "description": "Un cambio de código que mejora el rendimiento"},
-        {"value": "build", "name": "build:    Cambios que afectan el sistema de compilación o dependencias externas", "description": "Cambios que afectan el sistema de compilación o dependencias externas"},
-        {"value": "ci", "name": "ci:       Cambios en la configuración de CI", "description": "Cambios en los archivos y scripts de configuración de CI"}
-    ],
     "style_rules": {
         "use_imperative": "Escribe tu mensaje de commit en imperativo: 'Corregir error' y no 'Corregido error' o 'Corrige error'",
         "capitalize": "Usa mayúsculas al inicio del título y por cada párrafo del cuerpo del mensaje",
@@ -53,46 +49,159 @@ COMMIT_FORMAT_CONFIG = {
     }
 }
 
-# Lista de tipos de commit según el estándar
-COMMIT_TYPES = [
-    {"value": "feat", "name": "feat:     A new feature"},
-    {"value": "fix", "name": "fix:      A bug fix"},
-    {"value": "docs", "name": "docs:     Documentation only changes"},
-    {"value": "style", "name": "style:    Changes that do not affect the meaning of the code"},
-    {"value": "refactor", "name": "refactor: A code change that neither fixes a bug nor adds a feature"},
-    {"value": "perf", "name": "perf:     A code change that improves performance"},
-    {"value": "test", "name": "test:     Adding missing tests or correcting existing tests"},
-    {"value": "build", "name": "build:    Changes that affect the build system or external dependencies"},
-    {"value": "ci", "name": "ci:       Changes to CI configuration files and scripts"},
-    {"value": "chore", "name": "chore:    Other changes that don't modify src or test files"}
-]
-
-# Mensajes para el flujo de trabajo
-COMMIT_MESSAGES = {
-    "type": "Select the type of change that you're committing:",
-    "scope": "Denote the SCOPE of this change (optional):",
-    "customScope": "Denote the SCOPE of this change:",
-    "subject": "Write a SHORT, IMPERATIVE tense description of the change (max 100 chars):\n",
-    "body": "Provide a LONGER description of the change (optional). Use '|' to break new line:\n",
-    "breaking": "List any BREAKING CHANGES (optional):\n",
-    "footer": "List any ISSUES CLOSED by this change (optional). E.g.: #31, #34:\n",
-    "confirmCommit": "Are you sure you want to proceed with the commit above?"
-}
+# Lista de tipos de commit según el estándar: (valor, nombre mostrado en el menú)
+COMMIT_TYPES = (
+    ("feat", "feat:     A new feature"),
+    ("fix", "fix:      A bug fix"),
+    ("docs", "docs:     Documentation only changes"),
+    ("style", "style:    Changes that do not affect the meaning of the code"),
+    ("refactor", "refactor: A code change that neither fixes a bug nor adds a feature"),
+    ("perf", "perf:     A code change that improves performance"),
+    ("test", "test:     Adding missing tests or correcting existing tests"),
+    ("build", "build:    Changes that affect the build system or external dependencies"),
+    ("ci", "ci:       Changes to CI configuration files and scripts"),
+    ("chore", "chore:    Other changes that don't modify src or test files")
+)
+
+# Menú numerado de tipos de commit, generado una sola vez al cargar el módulo
+_MENU_LINES = "\n".join(f"{i}. {name}" for i, (_, name) in enumerate(COMMIT_TYPES, 1))
 
-# Mensajes traducidos para el flujo de trabajo en español
-COMMIT_MESSAGES_ES = {
-    "type": "Selecciona el tipo de cambio que estás confirmando:",
-    "scope": "Indica el ÁMBITO de este cambio (opcional):",
-    "customScope": "Indica el ÁMBITO de este cambio:",
-    "subject": "Escribe una descripción CORTA e IMPERATIVA del cambio (máx 100 caracteres):\n",
-    "body": "Proporciona una descripción MÁS LARGA del cambio (opcional). Usa '|' para saltos de línea:\n",
-    "breaking": "Lista cualquier CAMBIO DISRUPTIVO (opcional):\n",
-    "footer": "Lista cualquier ISSUE CERRADO por este cambio (opcional). Ej.: #31, #34:\n",
-    "confirmCommit": "¿Estás seguro de que deseas proceder con el commit anterior?"
+# Mensajes para el flujo de trabajo por idioma
+MESSAGES = {
+    "en": {
+        "type": "Select the type of change that you're committing:",
+        "scope": "Denote the SCOPE of this change (optional):",
+        "customScope": "Denote the SCOPE of this change:",
+        "subject": "Write a SHORT, IMPERATIVE tense description of the change (max 100 chars):\n",
+        "body": "Provide a LONGER description of the change (optional). Use '|' to break new line:\n",
+        "breaking": "List any BREAKING CHANGES (optional):\n",
+        "footer": "List any ISSUES CLOSED by this change (optional). E.g.: #31, #34:\n",
+        "confirmCommit": "Are you sure you want to proceed with the commit above?",
+        "no_last_message": "Could not get last commit message",
+        "last_commit_message": "Last commit message:",
+        "operation_cancelled": "Operation cancelled.",
+        "generating_new_message": "\nGenerating new commit message...",
+        "no_last_diff": "Could not get last commit diff",
+        "generate_failed": "Failed to generate commit message",
+        "new_commit_message": "New commit message:",
+        "apply_change": "\nApply this change? (y/n): ",
+        "commit_updated": "\n✅ Commit message updated successfully!",
+        "need_commit_to_rename": "Make sure you have at least one commit to rename.",
+        "adding_all_changes": "Adding all changes to staging area...",
+        "no_changes": "No changes to commit",
+        "generating_full_message": "\nGenerating full commit message...",
+        "commit_message": "Commit message:",
+        "commit_created": "\n✅ Commit created successfully!",
+        "commit_error": "Error creating commit: {error}",
+        "regenerating_message": "\nRegenerating commit message...",
+        "regenerate_failed": "Failed to regenerate message",
+        "current_message": "\nCurrent commit message / Mensaje actual:",
+        "enter_commit_message": "\nEnter your commit message (press Enter twice or Ctrl-D to finish):",
+        "commit_cancelled": "Commit cancelled.",
+        "invalid_option": "Invalid option. Please try again.",
+        "showing_recent_commits": "\nShowing last 10 commits for reference:",
+        "invalid_choice": "Invalid choice. Please try again.",
+        "generation_cancelled": "\nGeneration cancelled.",
+        "rules_reminder": "\n(Type ? when choosing the commit type to see the format rules again)",
+        "trivial_change": "\nOnly renames or whitespace changes: message built locally (use --no-shortcuts to always ask the AI).",
+        "restoring_branch": "\nCancelled, restoring the branch...",
+        "detached_head": "Cannot edit a commit with a detached HEAD",
+        "dirty_worktree": "Commit or stash your changes before editing an older commit",
+        "commit_not_found": "Could not get commit",
+        "commit_not_in_branch": "The commit is not part of the current branch",
+        "merge_after_commit": "Cannot edit a commit that is followed by a merge commit",
+        "rewriting_history": "Rewriting history..."
+    },
+    "es": {
+        "type": "Selecciona el tipo de cambio que estás confirmando:",
+        "scope": "Indica el ÁMBITO de este cambio (opcional):",
+        "customScope": "Indica el ÁMBITO de este cambio:",
+        "subject": "Escribe una descripción CORTA e IMPERATIVA del cambio (máx 100 caracteres):\n",
+        "body": "Proporciona una descripción MÁS LARGA del cambio (opcional). Usa '|' para saltos de línea:\n",
+        "breaking": "Lista cualquier CAMBIO DISRUPTIVO (opcional):\n",
+        "footer": "Lista cualquier ISSUE CERRADO por este cambio (opcional). Ej.: #31, #34:\n",
+        "confirmCommit": "¿Estás seguro de que deseas proceder con el commit anterior?",
+        "no_last_message": "No se pudo obtener el último mensaje de commit",
+        "last_commit_message": "Último mensaje de commit:",
+        "operation_cancelled": "Operación cancelada.",
+        "generating_new_message": "\nGenerando nuevo mensaje de commit...",
+        "no_last_diff": "No se pudo obtener el diff del último commit",
+        "generate_failed": "Error al generar el mensaje de commit",
+        "new_commit_message": "Nuevo mensaje de commit:",
+        "apply_change": "¿Aplicar este cambio? (s/n): ",
+        "commit_updated": "\n✅ ¡Mensaje de commit actualizado correctamente!",
+        "need_commit_to_rename": "Asegúrate de tener al menos un commit para renombrar.",
+        "adding_all_changes": "Añadiendo todos los cambios al área de staging...",
+        "no_changes": "No hay cambios para hacer commit",
+        "generating_full_message": "\nGenerando mensaje de commit completo...",
+        "commit_message": "Mensaje de commit:",
+        "commit_created": "\n✅ ¡Commit creado exitosamente!",
+        "commit_error": "Error al crear el commit: {error}",
+        "regenerating_message": "\nRegenerando mensaje de commit...",
+        "regenerate_failed": "Error al regenerar el mensaje",
+        "current_message": "\nMensaje actual:",
+        "enter_commit_message": "\nIngresa tu mensaje de commit (presiona Enter dos veces o Ctrl-D para terminar):",
+        "commit_cancelled": "Commit cancelado.",
+        "invalid_option": "Opción inválida. Inténtalo de nuevo.",
+        "showing_recent_commits": "\nMostrando los últimos 10 commits como referencia:",
+        "invalid_choice": "Opción inválida. Inténtalo de nuevo.",
+        "generation_cancelled": "\nGeneración cancelada.",
+        "rules_reminder": "\n(Escribe ? al elegir el tipo de commit para ver de nuevo las reglas de formato)",
+        "trivial_change": "\nSolo renombrados o cambios de espacios: mensaje generado localmente (usa --no-shortcuts para consultar siempre a la IA).",
+        "restoring_branch": "\nCancelado, restaurando la rama...",
+        "detached_head": "No se puede editar un commit con HEAD desacoplado",
+        "dirty_worktree": "Confirma o guarda (stash) tus cambios antes de editar un commit anterior",
+        "commit_not_found": "No se pudo obtener el commit",
+        "commit_not_in_branch": "El commit no pertenece a la rama actual",
+        "merge_after_commit": "No se puede editar un commit seguido de un commit de merge",
+        "rewriting_history": "Reescribiendo historial..."
+    }
 }
 
-# Historial de comandos ejecutados
-command_history = []
+def t(key, lang='en'):
+    """Return the interface text for key in the given language."""
+    return MESSAGES[lang][key]
+
+# Patrón precompilado para las referencias a issues del pie de página (#123)
+_ISSUE_RE = re.compile(r'#(\d+)')
+
+# Sesión HTTP compartida para reutilizar la conexión TLS con OpenRouter entre llamadas.
+# Se crea en el primer uso para no importar requests en los flujos que no usan la red.
+_SESSION = None
+
+def _get_session():
+    """Return the shared HTTP session, importing requests and creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        _SESSION = requests.Session()
+        # Los 502/503/504 pasajeros se reintentan aquí en lugar de obligar al usuario a regenerar
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["POST"])
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+        _SESSION.headers.update({"Content-Type": "application/json"})
+    return _SESSION
+
+# Directorio del script (donde se busca el .env), resuelto una sola vez
+HERE = Path(__file__).resolve().parent
+
+# Directorio de caché para los mensajes generados por la IA
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "commit-gen-ai"
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # Los mensajes cacheados caducan a los 7 días
+
+# Se desactiva con la opción --no-cache
+CACHE_ENABLED = True
+
+# Mensajes locales para cambios triviales (solo renombrados o solo espacios); se desactiva con --no-shortcuts
+SHORTCUTS_ENABLED = True
+
+# Con --exec-last el último comando git de crear/renombrar commit reemplaza al proceso de Python
+EXEC_LAST = False
+
+# Historial de comandos ejecutados (acotado para sesiones largas)
+command_history = deque(maxlen=256)
 
 def track_command(command, description):
     """Registra un comando ejecutado y su descripción."""
@@ -103,94 +212,314 @@ def show_command_summary(lang='en'):
     if not command_history:
         return
     
-    print("\n" + "="*50)
-    print("Command Summary / Resumen de Comandos:")
-    print("="*50)
-    
+    lines = [
+        "\n" + "="*50,
+        "Command Summary / Resumen de Comandos:",
+        "="*50
+    ]
     for i, (cmd, desc) in enumerate(command_history, 1):
-        print(f"\n{i}. {desc}")
-        print(f"   $ {cmd}")
-    
-    print("\n" + "="*50)
-    print("You can run these commands directly in your terminal /")
-    print("Puedes ejecutar estos comandos directamente en tu terminal")
-    print("="*50)
+        lines.append(f"\n{i}. {desc}")
+        lines.append(f"   $ {cmd}")
+    lines += [
+        "\n" + "="*50,
+        "You can run these commands directly in your terminal /",
+        "Puedes ejecutar estos comandos directamente en tu terminal",
+        "="*50
+    ]
+    print("\n".join(lines))
 
-def show_commit_format_rules(lang='en'):
-    """Muestra las reglas de formato para los mensajes de commit."""
-    print("\n" + "="*50)
-    print("Commit Format Rules / Reglas de Formato de Commit:")
-    print("-" * 50)
+def _build_format_rules_text(lang):
+    """Build the commit format rules help text for a language."""
+    subject_max = COMMIT_FORMAT_CONFIG['format_rules']['subject']['max_length']
+    wrap_length = COMMIT_FORMAT_CONFIG['format_rules']['body']['wrap_length']
+    style_rules = COMMIT_FORMAT_CONFIG['style_rules']
     
-    # Mostrar reglas de formato según el idioma
+    lines = [
+        "\n" + "="*50,
+        "Commit Format Rules / Reglas de Formato de Commit:",
+        "-" * 50
+    ]
+    
+    # Reglas de formato según el idioma
     if lang == 'en':
-        print("Subject Rules:")
-        print(f"- Maximum length: {COMMIT_FORMAT_CONFIG['format_rules']['subject']['max_length']} characters")
-        print("- Use imperative mood: 'Fix bug' not 'Fixed bug'")
-        print("- Capitalize first letter")
-        print("- No period at the end")
-        print("\nBody Rules:")
-        print(f"- Wrap text at {COMMIT_FORMAT_CONFIG['format_rules']['body']['wrap_length']} characters")
-        print("- Separate paragraphs with blank lines")
-        print("- Explain what and why, not how")
-        print("- Use bullet points with hyphens or asterisks when appropriate")
-        print("- Keep messages concise and direct")
-        print("- Briefly mention which files were modified, added or deleted")
+        lines += [
+            "Subject Rules:",
+            f"- Maximum length: {subject_max} characters",
+            "- Use imperative mood: 'Fix bug' not 'Fixed bug'",
+            "- Capitalize first letter",
+            "- No period at the end",
+            "\nBody Rules:",
+            f"- Wrap text at {wrap_length} characters",
+            "- Separate paragraphs with blank lines",
+            "- Explain what and why, not how",
+            "- Use bullet points with hyphens or asterisks when appropriate",
+            "- Keep messages concise and direct",
+            "- Briefly mention which files were modified, added or deleted"
+        ]
     else:  # Spanish
-        print("Reglas para el Asunto:")
-        print(f"- Longitud máxima: {COMMIT_FORMAT_CONFIG['format_rules']['subject']['max_length']} caracteres")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['use_imperative']}")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['capitalize']}")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['no_period_in_subject']}")
-        print("\nReglas para el Cuerpo:")
-        print(f"- Ajustar texto a {COMMIT_FORMAT_CONFIG['format_rules']['body']['wrap_length']} caracteres")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['separate_subject_body']}")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['explain_what_why']}")
-        print(f"- {COMMIT_FORMAT_CONFIG['style_rules']['bullet_points']}")
-        print("- Mantener los mensajes concisos y directos")
-        print("- Mencionar brevemente qué archivos fueron modificados, agregados o eliminados")
+        lines += [
+            "Reglas para el Asunto:",
+            f"- Longitud máxima: {subject_max} caracteres",
+            f"- {style_rules['use_imperative']}",
+            f"- {style_rules['capitalize']}",
+            f"- {style_rules['no_period_in_subject']}",
+            "\nReglas para el Cuerpo:",
+            f"- Ajustar texto a {wrap_length} caracteres",
+            f"- {style_rules['separate_subject_body']}",
+            f"- {style_rules['explain_what_why']}",
+            f"- {style_rules['bullet_points']}",
+            "- Mantener los mensajes concisos y directos",
+            "- Mencionar brevemente qué archivos fueron modificados, agregados o eliminados"
+        ]
     
-    print("="*50)
+    lines.append("="*50)
+    return "\n".join(lines)
+
+# Textos constantes por idioma, generados una sola vez al cargar el módulo
+_HELP = {lang: _build_format_rules_text(lang) for lang in MESSAGES}
+_TYPE_MENU = {lang: "\n" + MESSAGES[lang]["type"] + "\n" + _MENU_LINES for lang in MESSAGES}
+
+# Idiomas para los que ya se mostraron las reglas completas en esta sesión
+_RULES_SHOWN = set()
+
+def show_commit_format_rules(lang='en', force=False):
+    """Muestra las reglas de formato para los mensajes de commit.
+    
+    Solo la primera vez por sesión (o con force=True) se imprime el texto completo;
+    después basta un recordatorio de una línea.
+    """
+    if force or lang not in _RULES_SHOWN:
+        _RULES_SHOWN.add(lang)
+        print(_HELP[lang])
+    else:
+        print(t("rules_reminder", lang))
 
-def run_git_command(command):
-    """Ejecuta un comando git con codificación UTF-8 y manejo de errores mejorado"""
+# Hilos para lanzar lecturas de git independientes en paralelo (la espera del subproceso libera el GIL)
+_pool = ThreadPoolExecutor(max_workers=4)
+
+# Prefijo común de todas las invocaciones de git
+_GIT = ("git",)
+
+def _git(*args, env=None):
+    """Run `git <args>` and return its stripped UTF-8 output; raises CalledProcessError on failure."""
+    return subprocess.check_output(
+        _GIT + args,
+        stderr=subprocess.PIPE,
+        encoding='utf-8',
+        errors='replace',
+        env=env
+    ).strip()
+
+# Subcomandos de git que pueden mover HEAD y por tanto invalidan el SHA cacheado
+_HEAD_MUTATING_COMMANDS = {"commit", "rebase", "reset", "checkout", "switch", "pull", "merge", "revert", "cherry-pick"}
+
+# SHA de HEAD cacheado entre pasos del flujo interactivo
+_HEAD_CACHE = None
+
+# Últimos commits leídos con load_recent_commits(), válidos mientras HEAD no cambie
+_RECENT_COMMITS = None
+
+def invalidate_head():
+    """Forget the cached HEAD SHA and recent commits so the next lookups read them again."""
+    global _HEAD_CACHE, _RECENT_COMMITS
+    _HEAD_CACHE = None
+    _RECENT_COMMITS = None
+
+def get_head(force=False):
+    """Return the SHA of HEAD, resolving it through the cat-file process only when it is not cached."""
+    global _HEAD_CACHE
+    if force or _HEAD_CACHE is None:
+        _HEAD_CACHE = cat_info("HEAD")
+    return _HEAD_CACHE
+
+def same_commit_prefix(commit_id, sha):
+    """True if one SHA is a prefix of the other (an abbreviated ID naming the same commit)."""
+    n = min(len(commit_id), len(sha))
+    return commit_id[:n] == sha[:n]
+
+def run_git_command(command, env=None):
+    """Ejecuta un comando git (["git", ...]) con codificación UTF-8 y manejo de errores mejorado"""
+    if len(command) > 1 and command[1] in _HEAD_MUTATING_COMMANDS:
+        invalidate_head()
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            check=True
-        )
-        return result.stdout.strip()
+        return _git(*command[1:], env=env)
     except subprocess.CalledProcessError as e:
         print(f"Error ejecutando {' '.join(command)}: {e}")
         print(f"Salida de error: {e.stderr}")
         return None
 
+class _CatFileProc:
+    """Proceso persistente de `git cat-file --batch-command` para leer objetos sin lanzar git en cada consulta."""
+
+    def __init__(self):
+        self._proc = None
+        self.available = True  # False si el git instalado no soporta --batch-command
+
+    def _ensure_started(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-command", "--buffer"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        return self._proc
+
+    def _request(self, command, rev):
+        """Send '<command> <rev>' and return the reply header as (sha, type, size), or None."""
+        if not self.available:
+            return None
+        proc = self._ensure_started()
+        try:
+            # Con --buffer la salida se acumula hasta recibir "flush"
+            proc.stdin.write(f"{command} {rev}\nflush\n".encode('utf-8'))
+            proc.stdin.flush()
+        except BrokenPipeError:
+            # git < 2.36 no conoce --batch-command y el proceso termina al arrancar
+            self.available = False
+            return None
+        
+        # Cabecera: "<sha> <tipo> <tamaño>" o "<rev> missing" / "<rev> ambiguous"
+        line = proc.stdout.readline()
+        if not line:
+            self.available = False
+            return None
+        header = line.decode('utf-8', errors='replace').split()
+        if len(header) != 3:
+            return None
+        sha, obj_type, size = header
+        return sha, obj_type, int(size)
+
+    def info(self, rev):
+        """Return (sha, type, size) for the object named by rev, or None if it does not exist."""
+        return self._request("info", rev)
+
+    def read_object(self, rev):
+        """Return (type, bytes) for the object named by rev, or (None, None) if it does not exist."""
+        header = self._request("contents", rev)
+        if header is None:
+            return None, None
+        
+        _, obj_type, size = header
+        data = self._proc.stdout.read(size + 1)  # El contenido termina con un salto de línea extra
+        return obj_type, data[:-1]
+
+    def read_commit_message(self, rev):
+        """Return the full message of a commit (same as `git log -1 --pretty=%B`), or None."""
+        obj_type, data = self.read_object(f"{rev}^{{commit}}")
+        if obj_type is None and not self.available:
+            # git < 2.36: sin --batch-command, leer el mensaje con git log
+            return run_git_command(["git", "log", "-1", "--format=%B", rev])
+        if obj_type != "commit":
+            return None
+        # El mensaje empieza después de la primera línea en blanco que sigue a las cabeceras
+        _, _, message = data.partition(b"\n\n")
+        return message.decode('utf-8', errors='replace').strip()
+
+    def close(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+        self._proc = None
+
+_cat_file = _CatFileProc()
+atexit.register(_cat_file.close)
+
+def cat_info(rev):
+    """Resolve rev to a full SHA through the cat-file process, falling back to `git rev-parse`."""
+    info = _cat_file.info(rev)
+    if info is not None:
+        return info[0]
+    if not _cat_file.available:
+        return run_git_command(["git", "rev-parse", rev])
+    return None
+
+def exec_or_run(command):
+    """Run a final git command; with --exec-last, replace this process with git via os.execvp.
+    
+    When the process is replaced this function does not return.
+    """
+    if EXEC_LAST and os.name != 'nt':
+        # atexit no se ejecuta tras exec: cerrar a mano el proceso de cat-file y vaciar la salida
+        _cat_file.close()
+        sys.stdout.flush()
+        os.execvp(command[0], command)
+    return run_git_command(command)
+
+MAX_DIFF_BYTES = 32_000  # Bytes de diff conservados por archivo; el resto se omite
+
 def get_git_diff():
-    """Get the git diff of staged changes with proper encoding handling"""
+    """Get the git diff of staged changes as raw bytes (decoded only when building the prompt).
+    
+    The diff is read line by line from git and each file is capped at MAX_DIFF_BYTES,
+    so huge staged files never have to be held in memory as a whole.
+    """
     try:
-        diff = run_git_command(["git", "diff", "--staged"])
-        if diff is None:
-            return ""
+        # stderr va a un archivo temporal: una tubería que solo se lee al final podría llenarse
+        # con avisos por archivo (p. ej. "LF will be replaced by CRLF") y bloquear a git
+        with tempfile.TemporaryFile() as err_file:
+            proc = subprocess.Popen(_GIT + ("diff", "--staged"), stdout=subprocess.PIPE, stderr=err_file)
+            chunks = []
+            file_bytes = 0
+            truncated = False
+            for line in proc.stdout:
+                if line.startswith(b"diff --git"):
+                    file_bytes = 0
+                    truncated = False
+                elif truncated:
+                    continue
+                elif file_bytes + len(line) > MAX_DIFF_BYTES:
+                    # Seguir leyendo para vaciar la tubería, pero sin guardar el resto del archivo
+                    chunks.append(b"... (diff truncated / diff recortado)\n")
+                    truncated = True
+                    continue
+                file_bytes += len(line)
+                chunks.append(line)
+            if proc.wait() != 0:
+                err_file.seek(0)
+                stderr = err_file.read()
+                print(f"Error ejecutando git diff --staged: {stderr.decode('utf-8', errors='replace')}")
+                return b""
         track_command("git diff --staged", "Show staged changes / Mostrar cambios preparados")
-        return diff
+        return b"".join(chunks)
     except Exception as e:
         print(f"Error inesperado obteniendo git diff: {e}")
-        return ""
+        return b""
 
-def show_status(lang='en'):
-    """Show git repository status."""
+def refresh_repo_view(lang='en'):
+    """Show status, recent commits, local branches and staged changes, reading them from git concurrently."""
     try:
+        # Las cuatro lecturas son independientes: se lanzan a la vez y se muestran en orden
+        status_future = _pool.submit(run_git_command, ["git", "status", "-sb"])
+        log_future = _pool.submit(run_git_command, ["git", "log", "--oneline", "-5"])
+        branches_future = _pool.submit(run_git_command, ["git", "branch"])
+        staged_future = _pool.submit(run_git_command, ["git", "diff", "--staged", "--stat"])
+        
         print("\n" + "Repository Status / Estado del Repositorio:" + "\n" + "="*50)
-        status = run_git_command(["git", "status"])
+        status = status_future.result()
         if status:
             print(status)
-        track_command("git status", "Show repository status / Mostrar estado del repositorio")
+        track_command("git status -sb", "Show short repository status / Mostrar estado resumido del repositorio")
+        
+        log = log_future.result()
+        if log:
+            print("\n" + "Recent Commits / Commits Recientes:" + "\n" + "="*50)
+            print(log)
+        track_command("git log --oneline -5", "Show recent commits / Mostrar commits recientes")
+        
+        print("\n" + "Local Branches / Ramas Locales:" + "\n" + "="*50)
+        branches = branches_future.result()
+        if branches:
+            print(branches)
+        track_command("git branch", "List local branches / Listar ramas locales")
+        
+        staged = staged_future.result()
+        if staged:
+            print("\n" + "Staged Changes / Cambios Preparados:" + "\n" + "="*50)
+            print(staged)
+        track_command("git diff --staged --stat", "Summarize staged changes / Resumir cambios preparados")
     except Exception as e:
-        print(f"Error showing git status: {e}")
+        print(f"Error showing repository view: {e}")
 
 def add_files_to_stage(files=".", lang='en'):
     """Add files to staging area."""
@@ -223,16 +552,12 @@ def undo_changes(files=".", lang='en'):
 def push_changes(branch=None, lang='en'):
     """Push changes to remote repository."""
     try:
-        if not branch:
-            # Get current branch
-            branch = run_git_command(["git", "branch", "--show-current"])
-        
-        if branch:
-            run_git_command(["git", "push", "origin", branch])
-            track_command(f"git push origin {branch}", f"Push changes to remote / Subir cambios al repositorio remoto")
-            print("\n✅ Changes pushed successfully!" if lang == 'en' else "\n✅ ¡Cambios subidos exitosamente!")
-        else:
-            print("Could not determine current branch." if lang == 'en' else "No se pudo determinar la rama actual.")
+        # Sin rama explícita se sube HEAD, que git resuelve a la rama actual sin
+        # necesidad de consultarla antes con otro proceso
+        target = branch or "HEAD"
+        run_git_command(["git", "push", "origin", target])
+        track_command(f"git push origin {target}", f"Push changes to remote / Subir cambios al repositorio remoto")
+        print("\n✅ Changes pushed successfully!" if lang == 'en' else "\n✅ ¡Cambios subidos exitosamente!")
     except Exception as e:
         print(f"Error pushing changes: {e}")
 
@@ -313,24 +638,121 @@ def revert_last_commit(lang='en'):
     except Exception as e:
         print(f"Error reverting commit: {e}")
 
-def generate_commit_message(api_key, diff, commit_type, scope, lang='en'):
-    """Generate a commit message using Qwen 2.5 API with proper structure based on COMMIT_FORMAT_CONFIG"""
-    if not diff:
-        return "No changes to commit" if lang == 'en' else "No hay cambios para hacer commit"
+# Límites para resumir diffs grandes antes de enviarlos a la IA
+DIFF_COMPRESS_THRESHOLD = 8000  # Caracteres a partir de los cuales se resume el diff
+HUNK_MAX_LINES = 60             # Líneas modificadas por hunk antes de recortarlo
+HUNK_HEAD_LINES = 40            # Líneas conservadas al inicio de un hunk recortado
+HUNK_TAIL_LINES = 10            # Líneas conservadas al final de un hunk recortado
+
+def _compress_diff(diff):
+    """Shrink a large unified diff for the prompt.
     
-    # Forzar español para los mensajes de commit
-    lang = 'es'
+    Drops unchanged context lines, trims very long hunks to their first and last lines
+    and prepends a per-file summary of added/removed lines. Small diffs and non-patch
+    input (e.g. --name-status listings) are returned unchanged.
+    """
+    if len(diff) <= DIFF_COMPRESS_THRESHOLD or not diff.startswith("diff --git"):
+        return diff
     
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    summary = []   # [archivo, líneas añadidas, líneas eliminadas]
+    output = []
+    hunk = []
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    def flush_hunk():
+        if len(hunk) > HUNK_MAX_LINES:
+            omitted = len(hunk) - HUNK_HEAD_LINES - HUNK_TAIL_LINES
+            output.extend(hunk[:HUNK_HEAD_LINES])
+            output.append(f"... ({omitted} lines omitted / líneas omitidas)")
+            output.extend(hunk[-HUNK_TAIL_LINES:])
+        else:
+            output.extend(hunk)
+        hunk.clear()
     
+    in_file_header = False
+    for line in diff.split("\n"):
+        if line.startswith("diff --git"):
+            flush_hunk()
+            output.append(line)
+            summary.append([line.rsplit(" b/", 1)[-1], 0, 0])
+            in_file_header = True
+        elif in_file_header and line.startswith(("+++", "---")):
+            output.append(line)
+        elif line.startswith("@@"):
+            flush_hunk()
+            output.append(line)
+            in_file_header = False
+        elif line.startswith("+"):
+            hunk.append(line)
+            if summary:
+                summary[-1][1] += 1
+        elif line.startswith("-"):
+            hunk.append(line)
+            if summary:
+                summary[-1][2] += 1
+        # Las líneas de contexto y las cabeceras "index" no aportan al mensaje y se descartan
+    flush_hunk()
+    
+    stat = "\n".join(f" {name} | +{added} -{removed}" for name, added, removed in summary)
+    return f"Summary / Resumen:\n{stat}\n\n" + "\n".join(output)
+
+def _message_cache_path(diff, commit_type, scope, lang, cache_key=""):
+    """Return the cache file for a (diff, type, scope, lang, cache_key) combination."""
+    if isinstance(diff, str):
+        diff = diff.encode('utf-8', errors='replace')
+    parts = [diff, commit_type.encode('utf-8'), scope.encode('utf-8'), lang.encode('utf-8'), cache_key.encode('utf-8')]
+    key = hashlib.sha256(b"\0".join(parts)).hexdigest()
+    return CACHE_DIR / f"{key}.txt"
+
+def _read_cached_message(cache_path):
+    """Return the cached commit message, or None if it is not cached or has expired."""
+    try:
+        if time.time() - cache_path.stat().st_mtime > CACHE_TTL_SECONDS:
+            cache_path.unlink(missing_ok=True)
+            return None
+        return cache_path.read_text(encoding='utf-8') or None
+    except OSError:
+        return None
+
+def _write_cached_message(cache_path, message):
+    """Store a commit message in the cache atomically (write to a temp file, then os.replace)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(message, encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # La caché es opcional: un fallo al escribirla no debe interrumpir el flujo
+        print(f"Warning: could not write message cache: {e}")
+
+def cached_message(func):
+    """Cache the messages returned by func on disk, keyed by diff, type, scope and language.
+    
+    The wrapped function accepts use_cache=False to skip the lookup and refresh the entry, and
+    cache_key to tell apart inputs that are not a content diff (e.g. the commit SHA when the
+    "diff" is only a --name-status listing, which two different commits can share).
+    """
+    @functools.wraps(func)
+    def wrapper(api_key, diff, commit_type, scope, lang='en', use_cache=True, cache_key="", cancel=None):
+        if not diff or not CACHE_ENABLED:
+            return func(api_key, diff, commit_type, scope, lang, cancel)
+        
+        # Reutilizar el mensaje si ya se generó uno para exactamente los mismos cambios
+        cache_path = _message_cache_path(diff, commit_type, scope, lang, cache_key)
+        if use_cache:
+            message = _read_cached_message(cache_path)
+            if message:
+                return message
+        
+        message = func(api_key, diff, commit_type, scope, lang, cancel)
+        if message:
+            _write_cached_message(cache_path, message)
+        return message
+    return wrapper
+
+def _build_prompts(lang):
+    """Build the fixed system prompt and rules block sent with every generation request."""
     # Extraer reglas de formato de la configuración
     format_rules = COMMIT_FORMAT_CONFIG["format_rules"]
-    style_rules = COMMIT_FORMAT_CONFIG["style_rules"]
     
     # Construir prompts basados en la configuración
     if lang == 'en':
@@ -355,9 +777,8 @@ def generate_commit_message(api_key, diff, commit_type, scope, lang='en'):
             "- Use bullet points with hyphens for multiple changes"
         ]
         
-        user_prompt = (
-            f"Generate a concise conventional commit message for these changes. "
-            f"Use type: '{commit_type}' and scope: '{scope}'. Structure:\n\n"
+        rules_prompt = (
+            "Generate a concise conventional commit message for the changes in the next message. Structure:\n\n"
             "<type>(<scope>): <subject>\n\n"
             "- What was changed (brief technical description).\n"
             "- Impact/benefit (optional).\n"
@@ -366,7 +787,6 @@ def generate_commit_message(api_key, diff, commit_type, scope, lang='en'):
             + "\n".join(format_instructions) + "\n\n"
             "Style rules:\n"
             + "\n".join(style_instructions) + "\n\n"
-            f"Changes:\n{diff}\n\n"
             "The body should be brief and direct, mentioning only the files changed and a short explanation of why."
         )
     else:  # Spanish
@@ -391,9 +811,8 @@ def generate_commit_message(api_key, diff, commit_type, scope, lang='en'):
             "- Usa viñetas con guiones para múltiples cambios"
         ]
         
-        user_prompt = (
-            f"Genera un mensaje de commit convencional conciso para estos cambios. "
-            f"Usa tipo: '{commit_type}' y ámbito: '{scope}'. Estructura:\n\n"
+        rules_prompt = (
+            "Genera un mensaje de commit convencional conciso para los cambios del siguiente mensaje. Estructura:\n\n"
             "<tipo>(<ámbito>): <título>\n\n"
             "- Qué se cambió (técnico breve).\n"
             "- Impacto/beneficio (opcional).\n"
@@ -402,41 +821,162 @@ def generate_commit_message(api_key, diff, commit_type, scope, lang='en'):
             + "\n".join(format_instructions) + "\n\n"
             "Reglas de estilo:\n"
             + "\n".join(style_instructions) + "\n\n"
-            f"Cambios:\n{diff}\n\n"
             "El cuerpo debe ser breve y directo, mencionando solo los archivos cambiados y una explicación corta del por qué."
         )
     
+    return system_prompt, rules_prompt
+
+# Prompt de sistema y bloque de reglas por idioma, generados una sola vez al cargar el módulo.
+# Van al principio de la petición y no cambian entre llamadas, así el proveedor puede cachear ese prefijo.
+_PROMPTS = {lang: _build_prompts(lang) for lang in MESSAGES}
+
+# Único mensaje que cambia entre llamadas
+_CHANGES_TEMPLATE = {
+    "en": "Use type: '{commit_type}' and scope: '{scope}'.\n\nChanges:\n{diff}",
+    "es": "Usa tipo: '{commit_type}' y ámbito: '{scope}'.\n\nCambios:\n{diff}"
+}
+
+def _build_request_prefix(lang):
+    """Serialize the fixed part of the request body, leaving the messages list open."""
+    system_prompt, rules_prompt = _PROMPTS[lang]
     data = {
         "model": "qwen/qwen2.5-vl-72b-instruct:free",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
         "max_tokens": 300,  # Reducido para forzar mensajes más concisos
         "temperature": 0.5,
-        "stop": ["<|im_end|>"]
+        "stop": ["<|im_end|>"],
+        "stream": True,  # Recibir la respuesta token a token (Server-Sent Events)
+        # "messages" va al final para poder añadirle el mensaje variable sin volver a serializar el resto
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": rules_prompt}
+        ]
+    }
+    return json.dumps(data)[:-2] + ", "
+
+# Cuerpo JSON de la petición ya serializado hasta el último mensaje, por idioma
+_REQUEST_PREFIX = {lang: _build_request_prefix(lang) for lang in MESSAGES}
+
+@cached_message
+def generate_commit_message(api_key, diff, commit_type, scope, lang='en', cancel=None):
+    """Generate a commit message using Qwen 2.5 API with proper structure based on COMMIT_FORMAT_CONFIG
+    
+    If the threading.Event `cancel` gets set, the stream is closed and an empty message returned.
+    """
+    if not diff:
+        return t("no_changes", lang)
+    
+    # Forzar español para los mensajes de commit
+    lang = 'es'
+    
+    # El diff de cambios preparados llega como bytes; decodificar una sola vez al construir el prompt
+    if isinstance(diff, bytes):
+        diff = diff.decode('utf-8', errors='replace')
+    
+    # Resumir diffs grandes para reducir el tamaño del prompt
+    diff = _compress_diff(diff)
+    
+    url = "https://openrouter.ai/api/v1/chat/completions"
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}"
     }
     
+    # Solo se serializa el mensaje con los cambios; el resto del cuerpo ya está codificado
+    changes_prompt = _CHANGES_TEMPLATE[lang].format(commit_type=commit_type, scope=scope, diff=diff)
+    body = _REQUEST_PREFIX[lang] + json.dumps({"role": "user", "content": changes_prompt}) + "]}"
+    
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"].strip()
+        parts = []
+        with _get_session().post(url, headers=headers, data=body.encode('utf-8'), stream=True, timeout=(3, 60)) as response:
+            response.raise_for_status()
+            # Líneas como bytes, decodificadas siempre como UTF-8: sin charset en text/event-stream,
+            # requests usaría ISO-8859-1 y estropearía los acentos
+            for raw_line in response.iter_lines():
+                # El usuario canceló con Ctrl-C: cerrar la conexión y descartar la respuesta
+                if cancel is not None and cancel.is_set():
+                    return ""
+                line = raw_line.decode('utf-8', errors='replace')
+                # Ignorar líneas vacías y comentarios SSE (": OPENROUTER PROCESSING")
+                if not line or not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                choices = json.loads(payload).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    # Mostrar los tokens a medida que llegan, quitando antes el spinner
+                    if not parts:
+                        _stop_spinner()
+                    print(delta, end='', flush=True)
+                    parts.append(delta)
+        if parts:
+            print()
+        return "".join(parts).strip()
     except Exception as e:
+        _stop_spinner()
         print(f"Error generating commit message: {e}")
         return ""
 
+# Estado del spinner que se muestra mientras se espera el primer token de la API
+_SPINNER_FRAMES = "|/-\\"
+_spinner_lock = threading.Lock()
+_spinner_active = False
+
+def _stop_spinner():
+    """Erase the spinner, if it is still on screen, before anything else is printed."""
+    global _spinner_active
+    with _spinner_lock:
+        if _spinner_active:
+            sys.stdout.write("\r \r")
+            sys.stdout.flush()
+            _spinner_active = False
+
+def generate_with_progress(api_key, diff, commit_type, scope, lang='en', use_cache=True, cache_key=""):
+    """Run generate_commit_message in the background, showing a spinner until the first token.
+    
+    Ctrl-C cancels the request and returns an empty message.
+    """
+    global _spinner_active
+    # Un evento por llamada: un hilo cancelado que sigue esperando la red no se reactiva
+    # cuando empieza la siguiente generación
+    cancel = threading.Event()
+    _spinner_active = True
+    future = _pool.submit(generate_commit_message, api_key, diff, commit_type, scope, lang,
+                          use_cache=use_cache, cache_key=cache_key, cancel=cancel)
+    frames = itertools.cycle(_SPINNER_FRAMES)
+    try:
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeoutError:
+                with _spinner_lock:
+                    if _spinner_active:
+                        sys.stdout.write(f"\r{next(frames)}")
+                        sys.stdout.flush()
+    except KeyboardInterrupt:
+        cancel.set()
+        future.cancel()
+        _stop_spinner()
+        print(t("generation_cancelled", lang))
+        return ""
+    finally:
+        _stop_spinner()
+
 def get_commit_type(lang='en'):
     """Get the type of commit based on standards."""
-    print("\n" + (COMMIT_MESSAGES["type"] if lang == 'en' else COMMIT_MESSAGES_ES["type"]))
-    for i, t in enumerate(COMMIT_TYPES, 1):
-        print(f"{i}. {t['name']}")
+    print(_TYPE_MENU[lang])
     
     while True:
         try:
-            choice = int(input("\nEnter number / Ingresa el número: ")) - 1
+            answer = input("\nEnter number / Ingresa el número: ").strip()
+            if answer == "?":
+                show_commit_format_rules(lang, force=True)
+                continue
+            choice = int(answer) - 1
             if 0 <= choice < len(COMMIT_TYPES):
-                return COMMIT_TYPES[choice]["value"]
-            print("Invalid choice. Please try again." if lang == 'en' else "Opción inválida. Inténtalo de nuevo.")
+                return COMMIT_TYPES[choice][0]
+            print(t("invalid_choice", lang))
         except ValueError:
             print("Please enter a valid number." if lang == 'en' else "Por favor, ingresa un número válido.")
 
@@ -450,13 +990,13 @@ def get_language_choice():
 
 def get_commit_scope(lang='en'):
     """Get the scope of the changes."""
-    prompt = COMMIT_MESSAGES["scope"] if lang == 'en' else COMMIT_MESSAGES_ES["scope"]
+    prompt = MESSAGES[lang]["scope"]
     scope = input(f"\n{prompt} ").strip()
     return scope if scope else ""
 
 def get_commit_body(lang='en'):
     """Get the body of the commit message."""
-    prompt = COMMIT_MESSAGES["body"] if lang == 'en' else COMMIT_MESSAGES_ES["body"]
+    prompt = MESSAGES[lang]["body"]
     print(f"\n{prompt}")
     body = input().strip()
     # Reemplazar | con saltos de línea
@@ -464,18 +1004,42 @@ def get_commit_body(lang='en'):
 
 def get_commit_breaking(lang='en'):
     """Get breaking changes information."""
-    prompt = COMMIT_MESSAGES["breaking"] if lang == 'en' else COMMIT_MESSAGES_ES["breaking"]
+    prompt = MESSAGES[lang]["breaking"]
     print(f"\n{prompt}")
     breaking = input().strip()
     return f"BREAKING CHANGE: {breaking}" if breaking else ""
 
 def get_commit_footer(lang='en'):
     """Get footer information (issues closed)."""
-    prompt = COMMIT_MESSAGES["footer"] if lang == 'en' else COMMIT_MESSAGES_ES["footer"]
+    prompt = MESSAGES[lang]["footer"]
     print(f"\n{prompt}")
     footer = input().strip()
     return f"Closes: {footer}" if footer else ""
 
+def _wrap_text(text, width, subsequent_indent=""):
+    """Wrap text at word boundaries to at most width columns (lightweight textwrap.fill)."""
+    lines = []
+    current = ""
+    for word in text.split():
+        if not current:
+            current = word
+        elif len(current) + 1 + len(word) <= width:
+            current += " " + word
+        else:
+            lines.append(current)
+            current = subsequent_indent + word
+    if current:
+        lines.append(current)
+    return "\n".join(lines)
+
+def _wrap_bulleted(text, width, indent):
+    """Wrap a bullet line, aligning continuation lines with the text after the bullet."""
+    bullet = text[0] + " "  # La viñeta y un espacio
+    content = text[2:].strip()  # El texto después de la viñeta
+    # Ajustar el texto con sangría para las líneas adicionales
+    wrapped = _wrap_text(content, width - len(bullet) - indent, " " * (indent + len(bullet)))
+    return bullet + wrapped
+
 def format_commit_message(commit_type, scope, subject, body="", breaking="", footer=""):
     """Format the commit message according to conventional commit standards and COMMIT_FORMAT_CONFIG rules."""
     # Obtener reglas de formato
@@ -501,37 +1065,34 @@ def format_commit_message(commit_type, scope, subject, body="", breaking="", foo
     else:
         header = f"{commit_type}: {subject}"
     
+    # Caso más común: solo encabezado, no hay nada más que formatear
+    if not body and not breaking and not footer:
+        return header
+    
     # Formatear el cuerpo con ajuste de texto y separación de párrafos
     formatted_body = ""
     if body:
+        wrap_length = format_rules["body"]["wrap_length"]
         # Dividir el cuerpo en párrafos
         paragraphs = body.split("\n\n")
         wrapped_paragraphs = []
         
         for paragraph in paragraphs:
             # Verificar si es una lista con viñetas
-            if paragraph.strip().startswith("-") or paragraph.strip().startswith("*"):
+            if paragraph.strip().startswith(("-", "*")):
                 # Procesar cada línea de la lista manteniendo las viñetas
-                lines = paragraph.split("\n")
                 wrapped_lines = []
-                for line in lines:
-                    if line.strip().startswith("-") or line.strip().startswith("*"):
+                for line in paragraph.split("\n"):
+                    if line.strip().startswith(("-", "*")):
                         # Es una viñeta, ajustar con sangría
-                        indent = " " * 2  # 2 espacios de sangría después de la viñeta
-                        bullet = line.strip()[0] + " "  # La viñeta y un espacio
-                        text = line.strip()[2:].strip()  # El texto después de la viñeta
-                        # Ajustar el texto con sangría para las líneas adicionales
-                        wrapped_text = textwrap.fill(text, 
-                                                    width=format_rules["body"]["wrap_length"]-len(bullet)-len(indent),
-                                                    subsequent_indent=indent+" "*len(bullet))
-                        wrapped_lines.append(bullet + wrapped_text)
+                        wrapped_lines.append(_wrap_bulleted(line.strip(), wrap_length, 2))
                     else:
                         # No es una viñeta, ajustar normalmente
-                        wrapped_lines.append(textwrap.fill(line, width=format_rules["body"]["wrap_length"]))
+                        wrapped_lines.append(_wrap_text(line, wrap_length))
                 wrapped_paragraphs.append("\n".join(wrapped_lines))
             else:
                 # Párrafo normal, ajustar a la longitud especificada
-                wrapped_paragraphs.append(textwrap.fill(paragraph, width=format_rules["body"]["wrap_length"]))
+                wrapped_paragraphs.append(_wrap_text(paragraph, wrap_length))
         
         # Unir los párrafos con doble salto de línea
         formatted_body = "\n\n".join(wrapped_paragraphs)
@@ -545,7 +1106,7 @@ def format_commit_message(commit_type, scope, subject, body="", breaking="", foo
     formatted_footer = footer
     if footer and "#" in footer and "Soluciona" not in footer and "Closes" not in footer:
         # Intentar formatear referencias a issues si no están ya formateadas
-        issue_refs = re.findall(r'#(\d+)', footer)
+        issue_refs = _ISSUE_RE.findall(footer)
         if issue_refs:
             formatted_refs = [format_rules["footer"]["issue_references"].replace("{issue}", ref) for ref in issue_refs]
             formatted_footer = "\n".join(formatted_refs)
@@ -572,42 +1133,243 @@ def format_commit_message(commit_type, scope, subject, body="", breaking="", foo
     
     return "\n".join(message_parts)
 
+def load_recent_commits(n=10):
+    """Return the last n commits as dicts {sha, subject, body, files} read with a single `git log`.
+    
+    The list is cached until invalidate_head() runs.
+    """
+    global _RECENT_COMMITS
+    if _RECENT_COMMITS is not None and _RECENT_COMMITS[0] >= n:
+        return _RECENT_COMMITS[1][:n]
+    
+    # Cada registro empieza con \x1e y lleva "<sha>\0<asunto>\0<cuerpo>\0" seguido de --name-status
+    output = run_git_command(["git", "log", f"-n{n}", "--format=%x1e%H%x00%s%x00%b%x00", "--name-status"])
+    if output is None:
+        return []
+    
+    commits = []
+    for record in output.split("\x1e"):
+        # El primer separador desaparece con el strip() de _git (\x1e cuenta como espacio en blanco)
+        if not record:
+            continue
+        sha, subject, body, files = record.split("\x00", 3)
+        commits.append({"sha": sha, "subject": subject, "body": body.strip(), "files": files.strip()})
+    
+    _RECENT_COMMITS = (n, commits)
+    return commits
+
+def find_recent_commit(commit_id):
+    """Look up a commit among the recent ones by full or abbreviated SHA; None if absent or ambiguous."""
+    commit_id = commit_id.lower()
+    if len(commit_id) < 4:
+        return None
+    matches = [c for c in load_recent_commits() if c["sha"].startswith(commit_id)]
+    return matches[0] if len(matches) == 1 else None
+
 def get_commit_by_id(commit_id, lang='en'):
     """Get commit information by its ID."""
+    recent = find_recent_commit(commit_id)
+    if recent:
+        return {
+            "id": commit_id,
+            "sha": recent["sha"],
+            "message": f"{recent['subject']}\n\n{recent['body']}" if recent["body"] else recent["subject"],
+            "diff": recent["files"]
+        }
+    
     try:
-        # Verificar que el commit existe
-        if not run_git_command(["git", "rev-parse", "--verify", commit_id]):
+        # Verificar el commit y obtener mensaje y archivos modificados en una sola invocación:
+        # "<sha>\n<mensaje>\0" seguido de la salida de --name-status
+        output = run_git_command(["git", "log", "-1", "--format=%H%n%B%x00", "--name-status", commit_id])
+        if not output:
             print(f"Commit con ID {commit_id} no encontrado" if lang == 'es' else f"Commit with ID {commit_id} not found")
             return None
         
-        # Obtener el mensaje del commit
-        commit_message = run_git_command(["git", "log", "-1", "--pretty=%B", commit_id])
-        
-        # Obtener el diff del commit
-        try:
-            diff = run_git_command(["git", "show", commit_id, "--name-status", "--pretty=format:"])
-        except:
-            # Intentar con otro enfoque si el anterior falla
-            parent_commit = run_git_command(["git", "rev-parse", f"{commit_id}^"])
-            if parent_commit:
-                diff = run_git_command(["git", "diff", parent_commit, commit_id])
-            else:
-                diff = ""
+        header, _, diff = output.partition("\x00")
+        sha, _, commit_message = header.partition("\n")
         
         return {
             "id": commit_id,
-            "message": commit_message or "",
-            "diff": diff or ""
+            "sha": sha,
+            "message": commit_message.strip(),
+            "diff": diff.strip()
         }
     except Exception as e:
         print(f"Error obteniendo commit: {e}")
         return None
 
+def read_multiline_input():
+    """Read a message from stdin until two consecutive blank lines or EOF (Ctrl-D).
+    
+    Lines are read with sys.stdin.readline(), so a pasted body is consumed without
+    going through input() once per line.
+    """
+    lines = []
+    for line in iter(sys.stdin.readline, ""):
+        line = line.rstrip("\n")
+        if line == "" and (not lines or lines[-1] == ""):
+            break
+        lines.append(line)
+    return "\n".join(lines).rstrip()
+
+def edit_message_in_editor(initial_message):
+    """Open $EDITOR on a temp file with the message, like `git commit -e`.
+    
+    Returns the edited message, or None when stdin is not a terminal or no editor is set.
+    """
+    editor = os.environ.get("VISUAL") or os.environ.get("EDITOR")
+    if not editor or not sys.stdin.isatty():
+        return None
+    
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", encoding="utf-8", delete=False) as f:
+        f.write(initial_message + "\n")
+        message_path = Path(f.name)
+    
+    try:
+        subprocess.run([*shlex.split(editor), str(message_path)], check=True)
+        return message_path.read_text(encoding="utf-8").rstrip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error opening editor: {e}")
+        return None
+    finally:
+        message_path.unlink(missing_ok=True)
+
+def cherry_pick_with_progress(commits, lang='en'):
+    """Cherry-pick commits onto HEAD, reading git's output as it runs to show progress.
+    
+    A failed pick or Ctrl-C aborts the cherry-pick, leaving HEAD where it was. Returns True on success.
+    """
+    invalidate_head()
+    total = len(commits)
+    done = 0
+    other_output = []
+    proc = subprocess.Popen(
+        _GIT + ("cherry-pick", "--allow-empty", *commits),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        encoding='utf-8',
+        errors='replace'
+    )
+    try:
+        with proc:
+            after_pick = False
+            for line in proc.stdout:
+                # git imprime "[<rama> <sha>] <asunto>" por cada commit aplicado, seguido de
+                # líneas con sangría (fecha, estadísticas) que no interesan. Las demás líneas con
+                # sangría se conservan: los errores listan así los archivos afectados
+                if line.startswith("["):
+                    done += 1
+                    after_pick = True
+                    print(f"\r{done}/{total}", end='', flush=True)
+                elif after_pick and line[:1].isspace():
+                    continue
+                else:
+                    after_pick = False
+                    other_output.append(line)
+        if done:
+            print()
+        if proc.returncode == 0:
+            return True
+        print(f"Error ejecutando git cherry-pick:\n{''.join(other_output)}")
+    except KeyboardInterrupt:
+        # git recibe también el SIGINT; esperar a que termine antes de deshacer
+        proc.wait()
+        print(t("restoring_branch", lang))
+    run_git_command(["git", "cherry-pick", "--abort"])
+    return False
+
+def _is_clean_worktree():
+    """True if there are no staged or unstaged changes to tracked files."""
+    return (subprocess.run(_GIT + ("diff", "--quiet")).returncode == 0
+            and subprocess.run(_GIT + ("diff", "--cached", "--quiet")).returncode == 0)
+
+def reword_commit(commit_id, new_message, lang='en'):
+    """Replace the message of an older commit without replaying it through an interactive rebase.
+    
+    Builds the new commit with `git commit-tree` from the original tree, parents and author,
+    cherry-picks only the commits that follow it on a detached HEAD, then moves the original
+    branch onto the result. Refuses to run with uncommitted changes or when a merge commit
+    follows the edited one (cherry-pick cannot replay it). Returns True on success.
+    """
+    orig_branch = run_git_command(["git", "symbolic-ref", "--short", "-q", "HEAD"])
+    if not orig_branch:
+        print(t("detached_head", lang))
+        return False
+    
+    # Los cherry-picks usan el índice y el árbol de trabajo: con cambios sin confirmar se mezclarían
+    if not _is_clean_worktree():
+        print(t("dirty_worktree", lang))
+        return False
+    
+    target_commit = cat_info(commit_id)
+    orig_head = get_head()
+    if not target_commit or not orig_head:
+        print(t("commit_not_found", lang))
+        return False
+    
+    # El rango a reescribir debe quedar acotado por el commit elegido: si no es ancestro de HEAD,
+    # target..HEAD bajaría hasta la base común y reescribiría commits que no tocan al elegido
+    if subprocess.run(_GIT + ("merge-base", "--is-ancestor", target_commit, orig_head)).returncode != 0:
+        print(t("commit_not_in_branch", lang))
+        return False
+    
+    # cherry-pick no sabe reaplicar un merge sin -m: rechazar el rango antes de tocar nada
+    if run_git_command(["git", "rev-list", "--merges", f"{target_commit}..{orig_head}"]):
+        print(t("merge_after_commit", lang))
+        return False
+    
+    following = run_git_command(["git", "rev-list", "--reverse", f"{target_commit}..{orig_head}"])
+    # Árbol, padres y autor del commit original, para que solo cambie el mensaje
+    details = run_git_command(["git", "show", "-s", "--date=raw", "--format=%T%x00%P%x00%an%x00%ae%x00%ad", target_commit])
+    if following is None or details is None:
+        return False
+    tree, parents, name, email, date = details.split("\0")
+    env = {**os.environ, "GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email, "GIT_AUTHOR_DATE": date}
+    parent_args = [arg for parent in parents.split() for arg in ("-p", parent)]
+    
+    print(t("rewriting_history", lang))
+    # El mensaje llega por stdin: commit-tree no toca el índice ni el árbol de trabajo
+    result = subprocess.run(
+        _GIT + ("commit-tree", tree, *parent_args),
+        input=new_message + "\n",
+        env=env,
+        capture_output=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    if result.returncode != 0:
+        print(f"Error ejecutando git commit-tree: {result.stderr}")
+        return False
+    new_commit = result.stdout.strip()
+    track_command(" ".join(["git", "commit-tree", tree, *parent_args]), "Create the reworded commit / Crear el commit con el nuevo mensaje")
+    
+    if following:
+        # HEAD desacoplado en el nuevo commit: no se crea ni se borra ninguna rama auxiliar
+        if run_git_command(["git", "checkout", "-q", "--detach", new_commit]) is None:
+            return False
+        track_command(f"git checkout --detach {new_commit}", "Detach HEAD at the reworded commit / Desacoplar HEAD en el commit editado")
+        ok = cherry_pick_with_progress(following.split(), lang)
+        track_command(f"git cherry-pick --allow-empty {' '.join(following.split())}",
+                      "Replay the commits after the edited one / Reaplicar los commits posteriores al editado")
+        # Si algo falló se vuelve a la rama original sin tocarla; si no, se mueve a la nueva punta
+        if ok:
+            ok = run_git_command(["git", "checkout", "-q", "-B", orig_branch]) is not None
+            track_command(f"git checkout -B {orig_branch}", "Move the branch to the new tip / Mover la rama a la nueva punta")
+        else:
+            run_git_command(["git", "checkout", "-q", orig_branch])
+            track_command(f"git checkout {orig_branch}", "Return to the original branch / Volver a la rama original")
+    else:
+        ok = run_git_command(["git", "update-ref", f"refs/heads/{orig_branch}", new_commit, orig_head]) is not None
+        invalidate_head()
+        track_command(f"git update-ref refs/heads/{orig_branch} {new_commit} {orig_head}",
+                      "Move the branch to the reworded commit / Mover la rama al commit editado")
+    return ok
+
 def edit_commit_manually(commit_id, lang='en'):
     """Edit a commit message manually."""
     try:
         # Obtener el mensaje actual del commit
-        commit_message = run_git_command(["git", "log", "-1", "--pretty=%B", commit_id])
+        commit_message = _cat_file.read_commit_message(commit_id)
         
         if commit_message is None:
             print(f"No se pudo obtener el mensaje del commit {commit_id}" if lang == 'es' else f"Could not get commit message for {commit_id}")
@@ -619,68 +1381,39 @@ def edit_commit_manually(commit_id, lang='en'):
         print(commit_message)
         print("="*50)
         
-        # Editar manualmente
-        print("\nEnter your new commit message (press Enter twice to finish):" if lang == 'en' 
-              else "\nIngresa el nuevo mensaje de commit (presiona Enter dos veces para terminar):")
-        lines = []
-        while True:
-            line = input()
-            if not line and (not lines or not lines[-1]):
-                break
-            lines.append(line)
-        
-        new_message = "\n".join(lines)
+        # Editar manualmente: con $EDITOR si hay uno configurado, o línea a línea en la terminal
+        new_message = edit_message_in_editor(commit_message)
+        if new_message is None:
+            print("\nEnter your new commit message (press Enter twice or Ctrl-D to finish):" if lang == 'en' 
+                  else "\nIngresa el nuevo mensaje de commit (presiona Enter dos veces o Ctrl-D para terminar):")
+            new_message = read_multiline_input()
         
         if not new_message.strip():
             print("Empty message. Operation cancelled." if lang == 'en' else "Mensaje vacío. Operación cancelada.")
             return
         
         print("\n" + "="*50)
-        print("New commit message:" if lang == 'en' else "Nuevo mensaje de commit:")
+        print(t("new_commit_message", lang))
         print("-" * 50)
         print(new_message)
         print("="*50)
         
         # Confirmar cambio
-        confirm = input("\nApply this change? (y/n): " if lang == 'en' 
-                     else "¿Aplicar este cambio? (s/n): ").strip().lower()
+        confirm = input(t("apply_change", lang)).strip().lower()
         
         if confirm in ['y', 's']:
             # Si es el último commit, usar --amend
-            head_commit = run_git_command(["git", "rev-parse", "HEAD"])
+            head_commit = get_head()
             
-            if commit_id == head_commit or commit_id.startswith(head_commit) or head_commit.startswith(commit_id):
+            if same_commit_prefix(commit_id, head_commit):
                 run_git_command(["git", "commit", "--amend", "-m", new_message])
                 track_command(f"git commit --amend -m \"{new_message}\"", "Amend last commit / Modificar último commit")
             else:
-                # Para commits anteriores, usar rebase interactivo
-                # Crear un script temporal para automatizar el rebase
-                script_content = f"#!/bin/sh\nsed -i '1s/pick/edit/' $1\n"
-                script_path = Path(__file__).parent / "git_rebase_script.sh"
-                
-                with open(script_path, "w") as f:
-                    f.write(script_content)
-                
-                # Hacer el script ejecutable
-                os.chmod(script_path, 0o755)
-                
-                # Iniciar rebase interactivo
-                parent_commit = run_git_command(["git", "rev-parse", f"{commit_id}^"])
-                
-                if not parent_commit:
-                    print("No se pudo obtener el commit padre" if lang == 'es' else "Could not get parent commit")
+                # Para commits anteriores, reescribir solo los commits posteriores
+                if not reword_commit(commit_id, new_message, lang):
                     return
-                
-                print("Starting interactive rebase..." if lang == 'en' else "Iniciando rebase interactivo...")
-                run_git_command(["git", "rebase", "-i", "--exec", f"git commit --amend -m '{new_message}' && git rebase --continue", parent_commit])
-                track_command(f"git rebase -i {parent_commit}", "Interactive rebase to edit commit / Rebase interactivo para editar commit")
-                
-                # Eliminar el script temporal
-                if script_path.exists():
-                    os.remove(script_path)
             
-            print("\n✅ Commit message updated successfully!" if lang == 'en' 
-                  else "\n✅ ¡Mensaje de commit actualizado correctamente!")
+            print(t("commit_updated", lang))
     except Exception as e:
         print(f"Error: {e}")
         print("Operation failed. Make sure the commit exists and you have permission to modify it." if lang == 'en'
@@ -689,21 +1422,21 @@ def edit_commit_manually(commit_id, lang='en'):
 def rename_last_commit(api_key, lang='en'):
     """Rename the last commit if it hasn't been pushed yet, following format rules."""
     try:
-        # Check if there are any commits to rename
-        run_git_command(["git", "log", "-1"])
-        
-        # Get the current commit message
-        old_message = run_git_command(["git", "log", "-1", "--pretty=%B"])
+        # Obtener el último commit (mensaje y archivos) de la lista de commits recientes
+        recent = load_recent_commits()
         
-        if old_message is None:
-            print("No se pudo obtener el último mensaje de commit" if lang == 'es' else "Could not get last commit message")
+        if not recent:
+            print(t("no_last_message", lang))
             return
         
+        last_commit = recent[0]
+        old_message = f"{last_commit['subject']}\n\n{last_commit['body']}" if last_commit["body"] else last_commit["subject"]
+        
         # Mostrar reglas de formato al usuario
         show_commit_format_rules(lang)
         
         print("\n" + "="*50)
-        print("Last commit message:" if lang == 'en' else "Último mensaje de commit:")
+        print(t("last_commit_message", lang))
         print("-" * 50)
         print(old_message)
         print("="*50)
@@ -717,29 +1450,22 @@ def rename_last_commit(api_key, lang='en'):
         edit_choice = input("\nEnter your choice / Ingresa tu opción: ").strip().upper()
         
         if edit_choice == 'C':
-            print("Operation cancelled." if lang == 'en' else "Operación cancelada.")
+            print(t("operation_cancelled", lang))
             return
         
         if edit_choice == 'M':
-            # Obtener el ID del último commit
-            head_commit = run_git_command(["git", "rev-parse", "HEAD"])
-            if head_commit:
-                # Editar manualmente
-                edit_commit_manually(head_commit, lang)
+            # Editar manualmente el último commit
+            edit_commit_manually(last_commit["sha"], lang)
             return
         
         # Generate new message with AI
-        print("\nGenerating new commit message..." if lang == 'en' else "\nGenerando nuevo mensaje de commit...")
+        print(t("generating_new_message", lang))
         
-        # Get the diff of the last commit
-        try:
-            diff = run_git_command(["git", "show", "HEAD", "--name-status", "--pretty=format:"])
-        except:
-            # Intentar con otro enfoque si el anterior falla
-            diff = run_git_command(["git", "diff", "HEAD~1", "HEAD"])
+        # Archivos modificados en el último commit; si no hay (commit vacío), usar el diff completo
+        diff = last_commit["files"] or run_git_command(["git", "diff", "HEAD~1", "HEAD"])
         
         if not diff:
-            print("No se pudo obtener el diff del último commit" if lang == 'es' else "Could not get last commit diff")
+            print(t("no_last_diff", lang))
             return
         
         # Get commit type and scope
@@ -747,32 +1473,58 @@ def rename_last_commit(api_key, lang='en'):
         scope = get_commit_scope(lang)
         
         # Generate message with AI
-        ai_message = generate_commit_message(api_key, diff, commit_type, scope, lang)
+        # La lista de archivos no identifica los cambios: la entrada de caché va ligada al commit
+        ai_message = generate_with_progress(api_key, diff, commit_type, scope, lang, cache_key=last_commit["sha"])
         
         if not ai_message:
-            print("Failed to generate commit message" if lang == 'en' 
-                  else "Error al generar el mensaje de commit")
+            print(t("generate_failed", lang))
             return
         
         print("\n" + "="*50)
-        print("New commit message:" if lang == 'en' else "Nuevo mensaje de commit:")
+        print(t("new_commit_message", lang))
         print("-" * 50)
         print(ai_message)
         print("="*50)
         
         # Ask for confirmation
-        confirm = input("\nApply this change? (y/n): " if lang == 'en' 
-                     else "¿Aplicar este cambio? (s/n): ").strip().lower()
+        confirm = input(t("apply_change", lang)).strip().lower()
         
         if confirm in ['y', 's']:
-            run_git_command(["git", "commit", "--amend", "-m", ai_message])
+            exec_or_run(["git", "commit", "--amend", "-m", ai_message])
             track_command(f"git commit --amend -m \"{ai_message}\"", "Amend last commit with new message / Modificar último commit con nuevo mensaje")
-            print("\n✅ Commit message updated successfully!" if lang == 'en' 
-                  else "\n✅ ¡Mensaje de commit actualizado correctamente!")
+            print(t("commit_updated", lang))
     except Exception as e:
         print(f"Error: {e}")
-        print("Make sure you have at least one commit to rename." if lang == 'en'
-              else "Asegúrate de tener al menos un commit para renombrar.")
+        print(t("need_commit_to_rename", lang))
+
+def trivial_commit_message(commit_type, scope):
+    """Build the message locally when the staged changes are only renames or only whitespace.
+    
+    Returns None when the changes need the AI to be described.
+    """
+    header = f"{commit_type}({scope})" if scope else commit_type
+    
+    # Solo renombrados sin cambios de contenido: todas las entradas son R100
+    name_status = run_git_command(["git", "diff", "--staged", "--name-status", "-M"])
+    if not name_status:
+        return None
+    entries = [line.split("\t") for line in name_status.splitlines()]
+    if all(entry[0] == "R100" and len(entry) == 3 for entry in entries):
+        if len(entries) == 1:
+            return f"{header}: Renombrar {entries[0][1]} a {entries[0][2]}"
+        body = "\n".join(f"- {old} → {new}" for _, old, new in entries)
+        return f"{header}: Renombrar {len(entries)} archivos\n\n{body}"
+    
+    # Solo espacios en blanco: --ignore-all-space también da exit 0 al crear o borrar archivos vacíos
+    # y con cambios de modo, así que antes se exige que todo sean modificaciones (M) sin resumen
+    # (--summary lista creaciones, borrados y cambios de modo)
+    if any(entry[0] != "M" for entry in entries) or run_git_command(["git", "diff", "--staged", "--summary"]):
+        return None
+    try:
+        _git("diff", "--staged", "--ignore-all-space", "--quiet")
+        return f"{header}: Ajustar espacios en blanco"
+    except subprocess.CalledProcessError:
+        return None
 
 def create_new_commit(api_key, lang='en'):
     """Create a new commit with AI-generated full message following format rules"""
@@ -781,25 +1533,30 @@ def create_new_commit(api_key, lang='en'):
     print("\n")
     
     # Añadir automáticamente todos los cambios al área de staging
-    print("Adding all changes to staging area..." if lang == 'en' else "Añadiendo todos los cambios al área de staging...")
+    print(t("adding_all_changes", lang))
     add_files_to_stage(".", lang)
     
     # Get git diff
     diff = get_git_diff()
     if not diff:
-        print("No changes to commit" if lang == 'en' else "No hay cambios para hacer commit")
+        print(t("no_changes", lang))
         return
     
     # Get commit type and scope
     commit_type = get_commit_type(lang)
     scope = get_commit_scope(lang)
     
-    # Generate full commit message with AI
-    print("\nGenerating full commit message..." if lang == 'en' else "\nGenerando mensaje de commit completo...")
-    formatted_message = generate_commit_message(api_key, diff, commit_type, scope, lang)
+    # Los cambios triviales no necesitan la IA; (R) sigue permitiendo pedirle un mensaje
+    formatted_message = trivial_commit_message(commit_type, scope) if SHORTCUTS_ENABLED else None
+    if formatted_message:
+        print(t("trivial_change", lang))
+    else:
+        # Generate full commit message with AI
+        print(t("generating_full_message", lang))
+        formatted_message = generate_with_progress(api_key, diff, commit_type, scope, lang)
     
     if not formatted_message:
-        print("Failed to generate commit message" if lang == 'en' else "Error al generar el mensaje de commit")
+        print(t("generate_failed", lang))
         return
     
     # Historial de mensajes generados
@@ -809,7 +1566,7 @@ def create_new_commit(api_key, lang='en'):
     while True:
         # Mostrar el mensaje formateado
         print("\n" + "="*50)
-        print("Commit message:" if lang == 'en' else "Mensaje de commit:")
+        print(t("commit_message", lang))
         print("-" * 50)
         print(formatted_message)
         print("="*50)
@@ -825,51 +1582,47 @@ def create_new_commit(api_key, lang='en'):
         
         if choice == 'A':  # Aceptar y hacer commit
             try:
-                run_git_command(["git", "commit", "-m", formatted_message])
+                exec_or_run(["git", "commit", "-m", formatted_message])
                 track_command(f"git commit -m \"{formatted_message}\"", "Create new commit / Crear nuevo commit")
-                print("\n✅ Commit created successfully!" if lang == 'en' else "\n✅ ¡Commit creado exitosamente!")
+                print(t("commit_created", lang))
                 break
             except Exception as e:
-                print(f"Error creating commit: {e}" if lang == 'en' else f"Error al crear el commit: {e}")
+                print(t("commit_error", lang).format(error=e))
                 break
         
         elif choice == 'R':  # Regenerar mensaje
-            print("\nRegenerating commit message..." if lang == 'en' else "\nRegenerando mensaje de commit...")
-            new_message = generate_commit_message(api_key, diff, commit_type, scope, lang)
+            print(t("regenerating_message", lang))
+            new_message = generate_with_progress(api_key, diff, commit_type, scope, lang, use_cache=False)
             if new_message:
                 formatted_message = new_message
                 message_history.append(new_message)
                 current_index = len(message_history) - 1
             else:
-                print("Failed to regenerate message" if lang == 'en' else "Error al regenerar el mensaje")
+                print(t("regenerate_failed", lang))
         
         elif choice == 'E':  # Editar manualmente
-            print("\nCurrent commit message / Mensaje actual:" if lang == 'en' else "\nMensaje actual:")
+            print(t("current_message", lang))
             print("-" * 50)
             print(formatted_message)
             print("-" * 50)
             
-            print("\nEnter your commit message (press Enter twice to finish):" if lang == 'en' 
-                  else "\nIngresa tu mensaje de commit (presiona Enter dos veces para terminar):")
-            lines = []
-            while True:
-                line = input()
-                if not line and (not lines or not lines[-1]):
-                    break
-                lines.append(line)
-            
-            formatted_message = "\n".join(lines)
+            # Con $EDITOR si hay uno configurado, o leyendo el mensaje de la terminal
+            edited_message = edit_message_in_editor(formatted_message)
+            if edited_message is None:
+                print(t("enter_commit_message", lang))
+                edited_message = read_multiline_input()
+            formatted_message = edited_message
             
             # Guardar en historial
             message_history.append(formatted_message)
             current_index = len(message_history) - 1
         
         elif choice == 'C':  # Cancelar
-            print("Commit cancelled." if lang == 'en' else "Commit cancelado.")
+            print(t("commit_cancelled", lang))
             break
         
         else:
-            print("Invalid option. Please try again." if lang == 'en' else "Opción inválida. Inténtalo de nuevo.")
+            print(t("invalid_option", lang))
 
 def edit_specific_commit(api_key, lang='en'):
     """Edit a specific commit by its ID, following format rules."""
@@ -877,16 +1630,16 @@ def edit_specific_commit(api_key, lang='en'):
     show_commit_format_rules(lang)
     
     # Mostrar los últimos commits para referencia
-    print("\nShowing last 10 commits for reference:" if lang == 'en' else "\nMostrando los últimos 10 commits como referencia:")
-    logs = run_git_command(["git", "log", "--oneline", "-n", "10"])
-    if logs:
-        print(logs)
+    print(t("showing_recent_commits", lang))
+    recent = load_recent_commits(10)
+    if recent:
+        print("\n".join(f"{c['sha'][:7]} {c['subject']}" for c in recent))
     
     # Solicitar ID del commit
     commit_id = input("\nEnter commit ID / Ingresa el ID del commit: ").strip()
     
     if not commit_id:
-        print("Operation cancelled." if lang == 'en' else "Operación cancelada.")
+        print(t("operation_cancelled", lang))
         return
     
     # Obtener información del commit
@@ -904,7 +1657,7 @@ def edit_specific_commit(api_key, lang='en'):
     edit_choice = input("\nEnter your choice / Ingresa tu opción: ").strip().upper()
     
     if edit_choice == 'C':
-        print("Operation cancelled." if lang == 'en' else "Operación cancelada.")
+        print(t("operation_cancelled", lang))
         return
     
     if edit_choice == 'M':
@@ -918,166 +1671,200 @@ def edit_specific_commit(api_key, lang='en'):
     scope = get_commit_scope(lang)
     
     # Generate message with AI
-    print("\nGenerating new commit message..." if lang == 'en' else "\nGenerando nuevo mensaje de commit...")
-    ai_message = generate_commit_message(api_key, commit_info["diff"], commit_type, scope, lang)
+    print(t("generating_new_message", lang))
+    # La lista de archivos no identifica los cambios: la entrada de caché va ligada al commit
+    ai_message = generate_with_progress(api_key, commit_info["diff"], commit_type, scope, lang, cache_key=commit_info["sha"])
     
     if not ai_message:
-        print("Failed to generate commit message" if lang == 'en' 
-              else "Error al generar el mensaje de commit")
+        print(t("generate_failed", lang))
         return
     
     print("\n" + "="*50)
-    print("New commit message:" if lang == 'en' else "Nuevo mensaje de commit:")
+    print(t("new_commit_message", lang))
     print("-" * 50)
     print(ai_message)
     print("="*50)
     
     # Ask for confirmation
-    confirm = input("\nApply this change? (y/n): " if lang == 'en' 
-                 else "¿Aplicar este cambio? (s/n): ").strip().lower()
+    confirm = input(t("apply_change", lang)).strip().lower()
     
     if confirm in ['y', 's']:
         # Si es el último commit, usar --amend
-        head_commit = run_git_command(["git", "rev-parse", "HEAD"])
+        head_commit = get_head()
         
-        if commit_id == head_commit or commit_id.startswith(head_commit) or head_commit.startswith(commit_id):
+        if same_commit_prefix(commit_id, head_commit):
             run_git_command(["git", "commit", "--amend", "-m", ai_message])
             track_command(f"git commit --amend -m \"{ai_message}\"", "Amend last commit / Modificar último commit")
         else:
-            # Para commits anteriores, usar rebase interactivo
-            # Crear un script temporal para automatizar el rebase
-            script_content = f"#!/bin/sh\nsed -i '1s/pick/edit/' $1\n"
-            script_path = Path(__file__).parent / "git_rebase_script.sh"
-            
-            with open(script_path, "w") as f:
-                f.write(script_content)
-            
-            # Hacer el script ejecutable
-            os.chmod(script_path, 0o755)
-            
-            # Iniciar rebase interactivo
-            parent_commit = run_git_command(["git", "rev-parse", f"{commit_id}^"])
-            
-            if not parent_commit:
-                print("No se pudo obtener el commit padre" if lang == 'es' else "Could not get parent commit")
+            # Para commits anteriores, reescribir solo los commits posteriores
+            if not reword_commit(commit_id, ai_message, lang):
                 return
-            
-            print("Starting interactive rebase..." if lang == 'en' else "Iniciando rebase interactivo...")
-            run_git_command(["git", "rebase", "-i", "--exec", f"git commit --amend -m '{ai_message}' && git rebase --continue", parent_commit])
-            track_command(f"git rebase -i {parent_commit}", "Interactive rebase to edit commit / Rebase interactivo para editar commit")
-            
-            # Eliminar el script temporal
-            if script_path.exists():
-                os.remove(script_path)
         
-        print("\n✅ Commit message updated successfully!" if lang == 'en' 
-              else "\n✅ ¡Mensaje de commit actualizado correctamente!")
+        print(t("commit_updated", lang))
+
+# Textos de los menús, generados una sola vez al cargar el módulo
+_GIT_MENU_TEXT = "\n".join([
+    "\n" + "="*50,
+    "Git Management Menu / Menú de Gestión de Git",
+    "="*50,
+    "1. Repository Status / Estado del Repositorio",
+    "2. Add Changes to Staging / Añadir Cambios al Staging",
+    "3. Undo Changes / Deshacer Cambios",
+    "4. Push Changes / Subir Cambios",
+    "5. Pull Changes / Descargar Cambios",
+    "6. Branch Management / Gestión de Ramas",
+    "7. Stash Management / Gestión de Stash",
+    "8. Revert Last Commit / Revertir Último Commit",
+    "9. Return to Main Menu / Volver al Menú Principal"
+])
+
+_ADD_MENU_TEXT = "\n".join([
+    "\nAdd files to staging / Añadir archivos al staging:",
+    "(A) Add all changes / Añadir todos los cambios",
+    "(S) Add specific files / Añadir archivos específicos",
+    "(C) Cancel / Cancelar"
+])
+
+_UNDO_MENU_TEXT = "\n".join([
+    "\nUndo changes / Deshacer cambios:",
+    "(A) Undo all changes / Deshacer todos los cambios",
+    "(S) Undo specific files / Deshacer archivos específicos",
+    "(C) Cancel / Cancelar"
+])
+
+_BRANCH_MENU_TEXT = "\n".join([
+    "\nBranch Management / Gestión de Ramas:",
+    "(L) List branches / Listar ramas",
+    "(C) Create new branch / Crear nueva rama",
+    "(S) Switch branch / Cambiar de rama",
+    "(R) Return / Regresar"
+])
+
+_STASH_MENU_TEXT = "\n".join([
+    "\nStash Management / Gestión de Stash:",
+    "(S) Stash changes / Guardar cambios temporales",
+    "(A) Apply stash / Aplicar cambios temporales",
+    "(R) Return / Regresar"
+])
+
+_MAIN_MENU_TEXT = "\n".join([
+    "\n" + "="*50,
+    "Main Menu / Menú Principal",
+    "="*50,
+    "1. Git Management / Gestión de Git",
+    "2. Create a new commit / Crear un nuevo commit",
+    "3. Rename last commit / Renombrar el último commit",
+    "4. Edit specific commit by ID / Editar commit específico por ID",
+    "5. Exit / Salir"
+])
+
+# Acciones de los submenús: opción -> función que recibe el idioma.
+# Las opciones que no están en la tabla (Cancelar/Regresar) no hacen nada.
+_ADD_ACTIONS = {
+    "A": lambda lang: add_files_to_stage(".", lang),
+    "S": lambda lang: add_files_to_stage(input("Enter file paths (space separated): ").strip(), lang)
+}
+
+_UNDO_ACTIONS = {
+    "A": lambda lang: undo_changes(".", lang),
+    "S": lambda lang: undo_changes(input("Enter file paths (space separated): ").strip(), lang)
+}
+
+_BRANCH_ACTIONS = {
+    "L": list_branches,
+    "C": lambda lang: create_branch(input("Enter new branch name: ").strip(), lang),
+    "S": lambda lang: switch_branch(input("Enter branch name to switch to: ").strip(), lang)
+}
+
+_STASH_ACTIONS = {
+    "S": lambda lang: stash_changes(input("Enter stash message (optional): ").strip(), lang),
+    "A": lambda lang: apply_stash(input("Enter stash ID (leave empty for last stash): ").strip() or None, lang)
+}
+
+def _submenu(text, actions):
+    """Build a git menu entry that prints a submenu and runs the chosen action."""
+    def run(lang):
+        print(text)
+        choice = input("\nEnter your choice: ").strip().upper()
+        action = actions.get(choice)
+        if action:
+            action(lang)
+    return run
+
+# Menú de gestión de git: opción -> función que recibe el idioma ("9" vuelve al menú principal)
+_GIT_MENU_ACTIONS = {
+    "1": refresh_repo_view,
+    "2": _submenu(_ADD_MENU_TEXT, _ADD_ACTIONS),
+    "3": _submenu(_UNDO_MENU_TEXT, _UNDO_ACTIONS),
+    "4": lambda lang: push_changes(input("Enter branch name (leave empty for current branch): ").strip() or None, lang),
+    "5": pull_changes,
+    "6": _submenu(_BRANCH_MENU_TEXT, _BRANCH_ACTIONS),
+    "7": _submenu(_STASH_MENU_TEXT, _STASH_ACTIONS),
+    "8": revert_last_commit
+}
 
 def git_management_menu(api_key, lang='en'):
     """Show the git management menu."""
     while True:
-        print("\n" + "="*50)
-        print("Git Management Menu / Menú de Gestión de Git")
-        print("="*50)
-        print("1. Repository Status / Estado del Repositorio")
-        print("2. Add Changes to Staging / Añadir Cambios al Staging")
-        print("3. Undo Changes / Deshacer Cambios")
-        print("4. Push Changes / Subir Cambios")
-        print("5. Pull Changes / Descargar Cambios")
-        print("6. Branch Management / Gestión de Ramas")
-        print("7. Stash Management / Gestión de Stash")
-        print("8. Revert Last Commit / Revertir Último Commit")
-        print("9. Return to Main Menu / Volver al Menú Principal")
+        print(_GIT_MENU_TEXT)
         
         choice = input("\nEnter your choice (1-9): ").strip()
         
-        if choice == '1':
-            show_status(lang)
-        elif choice == '2':
-            print("\nAdd files to staging / Añadir archivos al staging:")
-            print("(A) Add all changes / Añadir todos los cambios")
-            print("(S) Add specific files / Añadir archivos específicos")
-            print("(C) Cancel / Cancelar")
-            
-            add_choice = input("\nEnter your choice: ").strip().upper()
-            
-            if add_choice == 'A':
-                add_files_to_stage(".", lang)
-            elif add_choice == 'S':
-                files = input("Enter file paths (space separated): ").strip()
-                add_files_to_stage(files, lang)
-        elif choice == '3':
-            print("\nUndo changes / Deshacer cambios:")
-            print("(A) Undo all changes / Deshacer todos los cambios")
-            print("(S) Undo specific files / Deshacer archivos específicos")
-            print("(C) Cancel / Cancelar")
-            
-            undo_choice = input("\nEnter your choice: ").strip().upper()
-            
-            if undo_choice == 'A':
-                undo_changes(".", lang)
-            elif undo_choice == 'S':
-                files = input("Enter file paths (space separated): ").strip()
-                undo_changes(files, lang)
-        elif choice == '4':
-            branch = input("Enter branch name (leave empty for current branch): ").strip()
-            push_changes(branch if branch else None, lang)
-        elif choice == '5':
-            pull_changes(lang)
-        elif choice == '6':
-            print("\nBranch Management / Gestión de Ramas:")
-            print("(L) List branches / Listar ramas")
-            print("(C) Create new branch / Crear nueva rama")
-            print("(S) Switch branch / Cambiar de rama")
-            print("(R) Return / Regresar")
-            
-            branch_choice = input("\nEnter your choice: ").strip().upper()
-            
-            if branch_choice == 'L':
-                list_branches(lang)
-            elif branch_choice == 'C':
-                branch_name = input("Enter new branch name: ").strip()
-                create_branch(branch_name, lang)
-            elif branch_choice == 'S':
-                branch_name = input("Enter branch name to switch to: ").strip()
-                switch_branch(branch_name, lang)
-        elif choice == '7':
-            print("\nStash Management / Gestión de Stash:")
-            print("(S) Stash changes / Guardar cambios temporales")
-            print("(A) Apply stash / Aplicar cambios temporales")
-            print("(R) Return / Regresar")
-            
-            stash_choice = input("\nEnter your choice: ").strip().upper()
-            
-            if stash_choice == 'S':
-                message = input("Enter stash message (optional): ").strip()
-                stash_changes(message, lang)
-            elif stash_choice == 'A':
-                stash_id = input("Enter stash ID (leave empty for last stash): ").strip()
-                apply_stash(stash_id if stash_id else None, lang)
-        elif choice == '8':
-            revert_last_commit(lang)
-        elif choice == '9':
+        if choice == '9':
             break
+        action = _GIT_MENU_ACTIONS.get(choice)
+        if action:
+            action(lang)
         else:
-            print("Invalid choice. Please try again." if lang == 'en' else "Opción inválida. Inténtalo de nuevo.")
+            print(t("invalid_choice", lang))
         
         show_command_summary(lang)
 
+# Menú principal: opción -> (función que recibe la API key y el idioma, mostrar resumen al terminar)
+_MAIN_MENU_ACTIONS = {
+    "1": (git_management_menu, False),
+    "2": (create_new_commit, True),
+    "3": (rename_last_commit, True),
+    "4": (edit_specific_commit, True)
+}
+
 def main():
+    global CACHE_ENABLED, EXEC_LAST, SHORTCUTS_ENABLED
+    
+    # Modo de un solo disparo: `--single amend "<mensaje>"` cambia el mensaje del último
+    # commit reemplazando este proceso por git, sin cargar la configuración ni el menú
+    args = sys.argv[1:]
+    if args[:2] == ["--single", "amend"] and len(args) >= 3:
+        os.execvp("git", ["git", "commit", "--amend", "-m", args[2]])
+    
     # Forzar configuración regional para UTF-8
     os.environ['LC_ALL'] = 'C.UTF-8'
     os.environ['LANG'] = 'C.UTF-8'
     
-    # Load environment variables
-    env_path = Path(__file__).parent / '.env'
-    if not env_path.exists():
+    from dotenv import load_dotenv
+    
+    # --no-cache fuerza a pedir siempre un mensaje nuevo a la IA
+    if "--no-cache" in args:
+        CACHE_ENABLED = False
+    
+    # --no-shortcuts consulta a la IA incluso para renombrados o cambios de espacios
+    if "--no-shortcuts" in args:
+        SHORTCUTS_ENABLED = False
+    
+    # --exec-last termina la sesión con el commit, sin volver al menú ni mostrar el resumen
+    if "--exec-last" in args:
+        EXEC_LAST = True
+    
+    # Load environment variables (abrir directamente, sin comprobar antes si existe)
+    try:
+        with open(HERE / '.env', encoding='utf-8') as env_file:
+            load_dotenv(stream=env_file)
+    except FileNotFoundError:
         print("Error: .env file not found. Please create it with your Qwen API key.")
         print("Example .env file content:")
         print("QWEN_API_KEY=your_api_key_here")
         return
-        
-    load_dotenv(env_path)
+    
     api_key = os.getenv("QWEN_API_KEY")
     
     if not api_key:
@@ -1090,35 +1877,25 @@ def main():
     while True:
         # Clear command history for new operation
         command_history.clear()
+        # HEAD puede haber cambiado fuera de la herramienta entre operaciones
+        invalidate_head()
         
         # Ask user what they want to do
-        print("\n" + "="*50)
-        print("Main Menu / Menú Principal")
-        print("="*50)
-        print("1. Git Management / Gestión de Git")
-        print("2. Create a new commit / Crear un nuevo commit")
-        print("3. Rename last commit / Renombrar el último commit")
-        print("4. Edit specific commit by ID / Editar commit específico por ID")
-        print("5. Exit / Salir")
+        print(_MAIN_MENU_TEXT)
         
         choice = input("\nEnter your choice (1-5): ").strip()
         
-        if choice == '1':
-            git_management_menu(api_key, lang)
-        elif choice == '2':
-            create_new_commit(api_key, lang)
-            show_command_summary(lang)
-        elif choice == '3':
-            rename_last_commit(api_key, lang)
-            show_command_summary(lang)
-        elif choice == '4':
-            edit_specific_commit(api_key, lang)
-            show_command_summary(lang)
-        elif choice == '5':
+        if choice == '5':
             print("\nGoodbye! / ¡Hasta luego!")
             break
-        else:
-            print("Invalid choice. Please try again." if lang == 'en' else "Opción inválida. Inténtalo de nuevo.")
+        if choice not in _MAIN_MENU_ACTIONS:
+            print(t("invalid_choice", lang))
+            continue
+        
+        action, show_summary = _MAIN_MENU_ACTIONS[choice]
+        action(api_key, lang)
+        if show_summary:
+            show_command_summary(lang)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
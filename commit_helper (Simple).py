@@ -2,11 +2,47 @@ import os
 import subprocess
 import requests
 import sys
-import argparse
+import json
+import functools
+import hashlib
+import re
+import shlex
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional, Tuple
 
+# Separador de párrafos para extraer cuerpo y pie de un mensaje que no llegó como JSON
+_PARA_RE = re.compile(r'\n\s*\n')
+_QUOTES = '"\''  # Comillas que la IA a veces pone alrededor de toda la respuesta
+
+# orjson (opcional) decodifica la respuesta de la API en C; si no está instalado se usa json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# pygit2 (opcional) lee HEAD, la rama actual y los commits dentro del proceso, sin lanzar git;
+# si no está instalado se usa la línea de comandos. Las escrituras siempre van por git.
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Directorio del script (para el .env), resuelto una sola vez
+HERE = Path(__file__).resolve().parent
+
+# Hilos para lanzar lecturas de git independientes en paralelo (la espera del subproceso libera el GIL)
+_pool = ThreadPoolExecutor(max_workers=2)
+
+# Caché en disco de las respuestas de la IA (mismo directorio que commit-gen-ai.py)
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "commit-gen-ai"
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # Las respuestas cacheadas caducan a los 7 días
+
 # Configuración de formato de commit
 COMMIT_FORMAT_CONFIG = {
     "format_rules": """
@@ -94,42 +130,72 @@ COMMIT_MESSAGES_ES = {
     "confirmCommit": "¿Estás seguro de que deseas proceder con el commit anterior?"
 }
 
+# Sesión HTTP compartida: reutiliza la conexión TLS con OpenRouter entre llamadas (p. ej. al regenerar).
+# Los 502/503/504 pasajeros se reintentan aquí en lugar de obligar al usuario a regenerar.
+_HTTP = requests.Session()
+_HTTP.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["POST"])
+))
+_HTTP.headers.update({"Content-Type": "application/json"})
+
 def get_git_diff():
     """Get the git diff of staged changes."""
     try:
         result = subprocess.run(
             ["git", "diff", "--staged"],
             capture_output=True,
-            text=False,  # Cambiado a False para manejar bytes en lugar de texto
+            encoding='utf-8',
+            errors='replace',  # Decodificar con manejo de errores directamente al leer la salida
             check=True
         )
-        # Decodificar con manejo de errores
-        return result.stdout.decode('utf-8', errors='replace').strip()
+        return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"Error getting git diff: {e}")
         return ""
 
-def generate_commit_message(api_key, diff, lang='es'):
-    """Generate a complete commit message using Qwen 2.5 API.
-    Returns a dictionary with all commit message components.
+def _response_cache_path(diff, lang):
+    """Path of the cached AI response for a diff and language."""
+    key = hashlib.blake2b(f"{lang}\0{diff}".encode('utf-8', errors='replace'), digest_size=16).hexdigest()
+    return CACHE_DIR / f"simple-{key}.json"
+
+def generate_commit_message(get_api_key, diff, lang='es', bust=False, use_cache=True):
+    """Generate a complete commit message, reusing the cached response for the same diff.
+    
+    get_api_key is only called when the API has to be queried. With bust=True the cache is not
+    read (a real regeneration), but the new response is still stored. With use_cache=False the
+    cache is neither read nor written, for input that is not a content diff.
     """
-    if not diff:
-        return {
-            "type": "",
-            "scope": "",
-            "subject": "No changes to commit" if lang == 'es' else "No hay cambios para hacer commit",
-            "body": "",
-            "breaking": "",
-            "footer": ""
-        }
+    cache_path = _response_cache_path(diff, lang) if diff and use_cache else None
     
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    if cache_path and not bust:
+        try:
+            if time.time() - cache_path.stat().st_mtime < CACHE_TTL_SECONDS:
+                return json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    api_key = get_api_key()
+    if not api_key:
+        return {}
+    commit_data = _request_commit_message(api_key, diff, lang)
     
+    # Guardar solo respuestas útiles; escritura atómica para no dejar ficheros a medias
+    if cache_path and commit_data.get("subject"):
+        tmp_path = cache_path.with_suffix(".tmp")
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(commit_data), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Sin comprobar antes si existe: un solo unlink
+            tmp_path.unlink(missing_ok=True)
+    
+    return commit_data
+
+def _build_prompts(lang):
+    """Build the system prompt and the fixed start of the user prompt (everything except the diff)."""
     # Obtener las reglas de formato de commit
     format_rules = COMMIT_FORMAT_CONFIG["format_rules"]
     commit_types_rules = COMMIT_FORMAT_CONFIG["commit_types_rules"]
@@ -137,7 +203,7 @@ def generate_commit_message(api_key, diff, lang='es'):
     
     if lang == 'es':
         system_prompt = "You are a helpful assistant that generates clear and concise git commit messages following the conventional commit format and specific formatting rules."
-        user_prompt = (
+        user_prompt_head = (
             "Generate a complete commit message for the following changes. "  
             "Follow conventional commit format with the structure: <type>(<scope>): <subject>\n\n<body>\n\n<footer>\n\n"  
             "Where:\n"  
@@ -158,11 +224,11 @@ def generate_commit_message(api_key, diff, lang='es'):
             f"Follow these specific formatting rules:\n{format_rules}\n\n"  
             f"Commit types guidelines:\n{commit_types_rules}\n\n"  
             f"Style guidelines:\n{style_rules}\n\n"  
-            f"Changes:\n{diff}"
+            "Changes:\n"
         )
     else:  # Spanish
         system_prompt = "Eres un asistente que genera mensajes de commit claros y concisos siguiendo el formato de commit convencional y reglas específicas de formato."
-        user_prompt = (
+        user_prompt_head = (
             "Genera un mensaje de commit completo para los siguientes cambios. "  
             "Sigue el formato de commit convencional con la estructura: <tipo>(<ámbito>): <asunto>\n\n<cuerpo>\n\n<pie>\n\n"  
             "Donde:\n"  
@@ -183,9 +249,38 @@ def generate_commit_message(api_key, diff, lang='es'):
             f"Sigue estas reglas específicas de formato:\n{format_rules}\n\n"  
             f"Guía de tipos de commit:\n{commit_types_rules}\n\n"  
             f"Guía de estilo:\n{style_rules}\n\n"  
-            f"Cambios:\n{diff}"
+            "Cambios:\n"
         )
     
+    return system_prompt, user_prompt_head
+
+# Prompts por idioma, construidos una sola vez al importar el módulo
+_PROMPTS = {lang: _build_prompts(lang) for lang in ('es', 'en')}
+
+def _request_commit_message(api_key, diff, lang='es'):
+    """Generate a complete commit message using Qwen 2.5 API.
+    Returns a dictionary with all commit message components.
+    """
+    if not diff:
+        return {
+            "type": "",
+            "scope": "",
+            "subject": "No changes to commit" if lang == 'es' else "No hay cambios para hacer commit",
+            "body": "",
+            "breaking": "",
+            "footer": ""
+        }
+    
+    url = "https://openrouter.ai/api/v1/chat/completions"
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}"
+    }
+    
+    # Solo el diff cambia entre llamadas; el resto del prompt ya está construido
+    system_prompt, user_prompt_head = _PROMPTS[lang]
+    user_prompt = user_prompt_head + diff
+    
     data = {
         "model": "qwen/qwen2.5-vl-72b-instruct:free",
         "messages": [
@@ -198,19 +293,23 @@ def generate_commit_message(api_key, diff, lang='es'):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = _HTTP.post(url, headers=headers, json=data, timeout=(3, 60))
         response.raise_for_status()
-        ai_response = response.json()["choices"][0]["message"]["content"].strip('"\'\'').strip()
+        # Decodificar el cuerpo directamente desde los bytes, sin pasar por response.text
+        content = _json_loads(response.content)["choices"][0]["message"]["content"]
+        # Quitar comillas externas solo si las hay (caso poco frecuente)
+        if content[:1] in _QUOTES or content[-1:] in _QUOTES:
+            content = content.strip(_QUOTES)
+        ai_response = content.strip()
         
         # Intentar parsear la respuesta como JSON
-        import json
         try:
             # Extraer solo la parte JSON de la respuesta
             json_start = ai_response.find('{')
             json_end = ai_response.rfind('}')
             if json_start >= 0 and json_end >= 0:
                 json_str = ai_response[json_start:json_end+1]
-                commit_data = json.loads(json_str)
+                commit_data = _json_loads(json_str)
                 
                 # Asegurarse de que todos los campos existan
                 commit_data.setdefault("type", "")
@@ -226,58 +325,31 @@ def generate_commit_message(api_key, diff, lang='es'):
             pass
             
         # Fallback: extraer manualmente los componentes del mensaje
-        lines = ai_response.split('\n')
-        header = lines[0] if lines else ""
-        
-        # Extraer tipo y ámbito del encabezado
-        commit_type = ""
-        scope = ""
-        subject = ""
-        
-        if ':' in header:
-            header_parts = header.split(':', 1)
-            type_scope = header_parts[0].strip()
-            subject = header_parts[1].strip() if len(header_parts) > 1 else ""
-            
-            # Extraer tipo y ámbito
+        header, _, rest = ai_response.partition('\n')
+        
+        # Extraer tipo, ámbito y asunto del encabezado: el asunto es todo lo que sigue a los
+        # primeros dos puntos, y el ámbito lo que hay entre el primer "(" y el siguiente ")"
+        type_scope, colon, subject = header.partition(':')
+        commit_type, scope = "", ""
+        if colon:
+            type_scope, subject = type_scope.strip(), subject.strip()
             if '(' in type_scope and ')' in type_scope:
-                commit_type = type_scope.split('(', 1)[0].strip()
-                scope = type_scope.split('(', 1)[1].split(')', 1)[0].strip()
+                commit_type, _, scope = type_scope.partition('(')
+                commit_type, scope = commit_type.strip(), scope.partition(')')[0].strip()
             else:
                 commit_type = type_scope
         
-        # Extraer cuerpo y pie
-        body = ""
+        # Extraer cuerpo (primer párrafo) y pie (el resto)
+        paragraphs = _PARA_RE.split(rest.strip(), maxsplit=1)
+        body = paragraphs[0].strip()
+        footer_text = paragraphs[1].strip() if len(paragraphs) > 1 else ""
         footer = ""
         breaking = ""
         
-        if len(lines) > 1:
-            # Buscar líneas en blanco para separar cuerpo y pie
-            body_start = 1
-            while body_start < len(lines) and lines[body_start].strip() == "":
-                body_start += 1
-                
-            footer_start = len(lines)
-            for i in range(body_start, len(lines)):
-                if lines[i].strip() == "" and i+1 < len(lines) and lines[i+1].strip() != "":
-                    footer_start = i+1
-                    break
-            
-            # Extraer cuerpo
-            if body_start < footer_start:
-                body = "\n".join(lines[body_start:footer_start]).strip()
-            
-            # Extraer pie y breaking changes
-            if footer_start < len(lines):
-                footer_text = "\n".join(lines[footer_start:]).strip()
-                
-                # Buscar breaking changes en el pie
-                if "BREAKING CHANGE:" in footer_text:
-                    breaking_parts = footer_text.split("BREAKING CHANGE:", 1)
-                    breaking = breaking_parts[1].strip() if len(breaking_parts) > 1 else ""
-                    footer = breaking_parts[0].strip()
-                else:
-                    footer = footer_text
+        if footer_text:
+            # Buscar breaking changes en el pie
+            footer, _, breaking = footer_text.partition("BREAKING CHANGE:")
+            footer, breaking = footer.strip(), breaking.strip()
         
         return {
             "type": commit_type,
@@ -362,103 +434,300 @@ def format_commit_message(commit_type, scope, subject, body="", breaking="", foo
     # Formatear el encabezado: tipo(ámbito): asunto
     header = f"{commit_type}{scope}: {subject}"
     
-    # Construir el mensaje completo
+    # Construir el mensaje completo; las secciones se separan siempre con una línea en blanco
     message_parts = [header]
     
-    # Agregar cuerpo si existe, formateando según las reglas
+    # Agregar cuerpo si existe (ya llega con sus párrafos separados por líneas en blanco)
     if body:
-        message_parts.append("")  # Línea en blanco obligatoria entre título y cuerpo
-        
-        # Formatear el cuerpo: párrafos separados por líneas en blanco
-        # y ajustados a 72 caracteres aproximadamente
-        formatted_body = []
-        paragraphs = body.split("\n\n")
-        
-        for paragraph in paragraphs:
-            # Si es una lista con viñetas, preservar el formato
-            if paragraph.strip().startswith("-") or paragraph.strip().startswith("*"):
-                formatted_body.append(paragraph)
-            else:
-                # Formatear párrafo normal
-                formatted_body.append(paragraph)
-        
-        message_parts.append("\n\n".join(formatted_body))
+        message_parts.append(body)
     
     # Agregar breaking changes si existen
     if breaking:
-        if not body:  # Si no hay cuerpo, agregar línea en blanco después del encabezado
-            message_parts.append("")
         message_parts.append(f"BREAKING CHANGE: {breaking}")
     
     # Agregar footer si existe
     if footer:
-        if not body and not breaking:  # Si no hay cuerpo ni breaking changes, agregar línea en blanco
-            message_parts.append("")
-        
         # Formatear el footer según las reglas
         if not footer.startswith("Soluciona:") and not footer.startswith("Closes:"):
             footer = f"Soluciona: {footer}"
         
         message_parts.append(footer)
     
-    return "\n".join(message_parts)
+    return "\n\n".join(message_parts)
 
-def get_commit_by_id(commit_id, lang='en'):
-    """Get commit information by its ID."""
-    try:
-        # Verificar que el commit existe
-        result = subprocess.run(
-            ["git", "rev-parse", "--verify", commit_id],
-            capture_output=True, text=False, check=True
-        )
-        
-        # Obtener el mensaje del commit
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%B", commit_id],
-            capture_output=True, text=False, check=True
-        )
-        commit_message = result.stdout.decode('utf-8', errors='replace').strip()
-        
-        # Obtener el diff del commit
+def _git(*args):
+    """Run `git <args>` and return its stripped output; raises CalledProcessError on failure."""
+    return subprocess.check_output(
+        ["git", *args],
+        stderr=subprocess.PIPE,
+        encoding='utf-8',
+        errors='replace'
+    ).strip()
+
+@functools.lru_cache(maxsize=None)
+def _pygit2_repo(cwd):
+    """Open the repository containing cwd with pygit2, or None if pygit2 is missing or there is no repository."""
+    if pygit2 is None:
+        return None
+    path = pygit2.discover_repository(cwd)
+    return pygit2.Repository(path) if path else None
+
+@functools.lru_cache(maxsize=1)
+def get_head():
+    """Return the SHA of HEAD, memoized until get_head.cache_clear() after a commit is rewritten."""
+    repo = _pygit2_repo(os.getcwd())
+    if repo is not None:
         try:
-            diff_result = subprocess.run(
-                ["git", "show", commit_id, "--name-status", "--pretty=format:"],
-                capture_output=True, text=False, check=True
-            )
-            diff = diff_result.stdout.decode('utf-8', errors='replace')
-        except subprocess.CalledProcessError:
-            # Intentar con otro enfoque si el anterior falla
-            parent_result = subprocess.run(
-                ["git", "rev-parse", f"{commit_id}^"],
-                capture_output=True, text=False, check=True
-            )
-            parent_commit = parent_result.stdout.decode('utf-8', errors='replace').strip()
-            
-            diff_result = subprocess.run(
-                ["git", "diff", parent_commit, commit_id],
-                capture_output=True, text=False, check=True
-            )
-            diff = diff_result.stdout.decode('utf-8', errors='replace')
+            return str(repo.head.target)
+        except pygit2.GitError:
+            pass  # HEAD sin commits: dejar que git informe del error
+    return _git("rev-parse", "HEAD")
+
+def load_recent_commits(n=10):
+    """Return the last n commits as dicts {sha, oneline, message, diff} read with a single `git log`."""
+    # Cada registro empieza con \x1e y lleva "<sha>\0<hash corto> <asunto>\0<mensaje>\0" seguido de --name-status
+    output = _git("log", f"-n{n}", "--format=%x1e%H%x00%h %s%x00%B%x00", "--name-status")
+    
+    commits = []
+    for record in output.split("\x1e"):
+        # El primer separador desaparece con el strip() de _git (\x1e cuenta como espacio en blanco)
+        if not record:
+            continue
+        sha, oneline, message, diff = record.split("\x00", 3)
+        commits.append({"sha": sha, "oneline": oneline, "message": message.strip(), "diff": diff.strip()})
+    return commits
+
+def get_commit_by_id(commit_id, lang='en', recent=None):
+    """Get commit information by its ID.
+    
+    If the ID matches exactly one of the `recent` commits (from load_recent_commits), no git call is made.
+    """
+    prefix = commit_id.lower()
+    if recent and len(prefix) >= 4:
+        matches = [c for c in recent if c["sha"].startswith(prefix)]
+        if len(matches) == 1:
+            return {
+                "id": commit_id,
+                "message": matches[0]["message"],
+                "diff": matches[0]["diff"]
+            }
+    
+    try:
+        # Verificar el commit y obtener mensaje y archivos modificados en una sola invocación:
+        # "<sha>\n<mensaje>\0" seguido de la salida de --name-status
+        output = _git("log", "-1", "--format=%H%n%B%x00", "--name-status", commit_id)
+        header, _, diff = output.partition("\x00")
+        _, _, commit_message = header.partition("\n")
         
         return {
             "id": commit_id,
-            "message": commit_message,
-            "diff": diff
+            "message": commit_message.strip(),
+            "diff": diff.strip()
         }
     except subprocess.CalledProcessError as e:
         print(f"Error: {e}")
         print(f"Commit with ID {commit_id} not found." if lang == 'es' else f"No se encontró el commit con ID {commit_id}.")
         return None
 
+# Proceso persistente de `git cat-file --batch`, arrancado en la primera consulta
+_CAT_FILE = None
+
+def cat_object(rev):
+    """Return (sha, type, bytes) of the object named by rev, read through a persistent `git cat-file --batch`.
+    
+    Returns (None, None, None) if the object does not exist or the name is ambiguous.
+    """
+    global _CAT_FILE
+    if _CAT_FILE is None or _CAT_FILE.poll() is not None:
+        _CAT_FILE = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    _CAT_FILE.stdin.write(rev.encode('utf-8') + b"\n")
+    _CAT_FILE.stdin.flush()
+    
+    # Cabecera: "<sha> <tipo> <tamaño>" o "<rev> missing" / "<rev> ambiguous"
+    header = _CAT_FILE.stdout.readline().decode('utf-8', errors='replace').split()
+    if len(header) != 3:
+        return None, None, None
+    sha, obj_type, size = header
+    data = _CAT_FILE.stdout.read(int(size) + 1)  # El contenido termina con un salto de línea extra
+    return sha, obj_type, data[:-1]
+
+def close_cat_file():
+    """Stop the cat-file process, if it was started."""
+    if _CAT_FILE is not None and _CAT_FILE.poll() is None:
+        _CAT_FILE.stdin.close()
+        _CAT_FILE.wait()
+
+atexit.register(close_cat_file)
+
+def read_commit(rev):
+    """Return (sha, headers, message) of a commit, where headers maps each header name to its values.
+    
+    Raises CalledProcessError if rev does not name a commit.
+    """
+    sha, obj_type, data = cat_object(f"{rev}^{{commit}}")
+    if obj_type != "commit":
+        raise subprocess.CalledProcessError(128, ["git", "cat-file", "--batch", rev])
+    
+    # Cabeceras ("tree", "parent", "author"...) hasta la primera línea en blanco; luego el mensaje
+    raw_headers, _, message = data.decode('utf-8', errors='replace').partition("\n\n")
+    headers = {}
+    for line in raw_headers.split("\n"):
+        if line and not line.startswith(" "):  # Las líneas con espacio continúan una cabecera (gpgsig)
+            name, _, value = line.partition(" ")
+            headers.setdefault(name, []).append(value)
+    return sha, headers, message.strip()
+
+def commit_info(rev):
+    """Return (sha, parent, message) of a commit.
+    
+    parent is the first parent, or "" for a root commit. Raises CalledProcessError if rev does not exist.
+    """
+    sha, headers, message = read_commit(rev)
+    return sha, headers.get("parent", [""])[0], message
+
+def resolve_commit_and_head(rev):
+    """Return (head, sha, parent) with pygit2 or a single `git rev-parse`; parent is "" for a root commit.
+    
+    Raises CalledProcessError if rev does not exist.
+    """
+    repo = _pygit2_repo(os.getcwd())
+    if repo is not None:
+        try:
+            commit = repo.revparse_single(rev).peel(pygit2.Commit)
+            parent = str(commit.parent_ids[0]) if commit.parent_ids else ""
+            return str(repo.head.target), str(commit.id), parent
+        except (KeyError, ValueError, pygit2.GitError):
+            pass  # Revisión desconocida o ambigua: git da el error
+    
+    # rev^@ se expande a los padres del commit (ninguno si es el commit raíz)
+    shas = _git("rev-parse", "HEAD", f"{rev}^{{commit}}", f"{rev}^@").split()
+    return shas[0], shas[1], (shas[2:] or [""])[0]
+
+def head_info():
+    """Return (sha, parent, message) of HEAD."""
+    return commit_info("HEAD")
+
+def prompt(message):
+    """Like input(), but only flushes stdout before reading the answer with sys.stdin.readline()."""
+    sys.stdout.write(message)
+    sys.stdout.flush()
+    return sys.stdin.readline().rstrip("\n")
+
+def display_body(body):
+    """Return the body on one line, with '|' instead of line breaks."""
+    return body.replace("\n", "|") if "\n" in body else body
+
+# Campos del mensaje que se piden al editar, con su etiqueta en cada idioma
+FIELD_PROMPTS = {
+    'es': (
+        ("type", "Commit TYPE"),
+        ("scope", "Commit SCOPE"),
+        ("subject", "Commit SUBJECT"),
+        ("body", "Commit BODY (use '|' for line breaks)"),
+        ("breaking", "BREAKING CHANGES"),
+        ("footer", "FOOTER"),
+    ),
+    'en': (
+        ("type", "TIPO de commit"),
+        ("scope", "ÁMBITO del commit"),
+        ("subject", "ASUNTO del commit"),
+        ("body", "CUERPO del commit (usa '|' para saltos de línea)"),
+        ("breaking", "CAMBIOS DISRUPTIVOS"),
+        ("footer", "PIE DE PÁGINA"),
+    ),
+}
+
+def edit_commit_fields(data, lang):
+    """Ask for each field of the commit message; an empty answer keeps the current value.
+    
+    Returns a new dictionary with the six fields (type, scope, subject, body, breaking, footer).
+    """
+    edited = {}
+    for field, label in FIELD_PROMPTS[lang]:
+        current = data[field]
+        if field == "body":
+            # El cuerpo se muestra y se escribe en una sola línea, con '|' como salto de línea
+            answer = prompt(f"\n{label}\n[{display_body(current)}]: ").strip()
+            edited[field] = answer.replace('|', '\n') if answer else current
+        else:
+            edited[field] = prompt(f"\n{label} [{current}]: ").strip() or current
+    return edited
+
+def read_multiline_input():
+    """Read a message from stdin until two consecutive blank lines or EOF (Ctrl-D).
+    
+    Lines are read with sys.stdin.readline(), so a pasted message is consumed without
+    going through input() once per line.
+    """
+    lines = []
+    for line in iter(sys.stdin.readline, ""):
+        line = line.rstrip("\n")
+        if line == "" and (not lines or lines[-1] == ""):
+            break
+        lines.append(line)
+    return "\n".join(lines).rstrip()
+
+def reword_commit(target_commit, new_message, lang='en'):
+    """Replace the message of target_commit, an ancestor of HEAD, and replay the commits after it.
+    
+    The new commit is built with `git commit-tree` on the original tree, parents and author, and
+    the descendants are moved onto it with a non-interactive `git rebase --onto`. Returns False,
+    after saying why, if the tree has uncommitted changes, the commit is not an ancestor of HEAD
+    or a merge follows it (rebase would flatten it).
+    """
+    # El rebase usa el índice y el árbol de trabajo: con cambios sin confirmar se mezclarían
+    if (subprocess.run(["git", "diff", "--quiet"]).returncode != 0
+            or subprocess.run(["git", "diff", "--cached", "--quiet"]).returncode != 0):
+        print("Commit or stash your changes before editing an older commit" if lang == 'es'
+              else "Confirma o guarda (stash) tus cambios antes de editar un commit anterior")
+        return False
+    
+    # Un commit de otra rama haría reaplicar los commits de la actual sobre esa otra rama
+    if subprocess.run(["git", "merge-base", "--is-ancestor", target_commit, "HEAD"]).returncode != 0:
+        print("The commit is not part of the current branch" if lang == 'es'
+              else "El commit no pertenece a la rama actual")
+        return False
+    
+    if _git("rev-list", "--merges", f"{target_commit}..HEAD"):
+        print("Cannot edit a commit that is followed by a merge" if lang == 'es'
+              else "No se puede editar un commit seguido de un merge")
+        return False
+    
+    print("Rewriting history..." if lang == 'es' else "Reescribiendo el historial...")
+    
+    # Árbol, padres y autor del commit original, para que solo cambie el mensaje
+    _, headers, _ = read_commit(target_commit)
+    tree = headers["tree"][0]
+    # "Nombre <email> <timestamp> <zona>"
+    name, _, rest = headers["author"][0].partition(" <")
+    email, _, date = rest.partition("> ")
+    env = {**os.environ, "GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email, "GIT_AUTHOR_DATE": date}
+    # Todos los padres, para que un merge siga siéndolo
+    parent_args = [arg for parent in headers.get("parent", []) for arg in ("-p", parent)]
+    
+    # El mensaje llega por stdin, sin pasar por ningún shell
+    new_commit = subprocess.run(
+        ["git", "commit-tree", tree, *parent_args],
+        input=new_message + "\n",
+        env=env,
+        capture_output=True,
+        encoding='utf-8',
+        check=True
+    ).stdout.strip()
+    
+    subprocess.run(["git", "rebase", "--onto", new_commit, target_commit], check=True)
+    return True
+
 def edit_commit_manually(commit_id, lang='en'):
     """Edit a commit message manually."""
     try:
-        # Obtener el mensaje actual del commit
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%B", commit_id],
-            capture_output=True, text=False, check=True
-        )
-        old_message = result.stdout.decode('utf-8', errors='replace').strip()
+        # Obtener SHA y mensaje actual del commit en una sola llamada
+        target_commit, _, old_message = commit_info(commit_id)
         
         print("\n" + "="*50)
         print(f"Current commit message ({commit_id}):" if lang == 'es' else f"Mensaje actual del commit ({commit_id}):")
@@ -469,14 +738,7 @@ def edit_commit_manually(commit_id, lang='en'):
         # Editar manualmente
         print("\nEnter your new commit message (press Enter twice to finish):" if lang == 'es' 
               else "\nIngresa el nuevo mensaje de commit (presiona Enter dos veces para terminar):")
-        lines = []
-        while True:
-            line = input()
-            if not line and (not lines or not lines[-1]):
-                break
-            lines.append(line)
-        
-        new_message = "\n".join(lines)
+        new_message = read_multiline_input()
         
         if not new_message.strip():
             print("Empty message. Operation cancelled." if lang == 'es' else "Mensaje vacío. Operación cancelada.")
@@ -494,44 +756,20 @@ def edit_commit_manually(commit_id, lang='en'):
         
         if confirm in ['y', 's']:
             # Si es el último commit, usar --amend
-            head_result = subprocess.run(
-                ["git", "rev-parse", "HEAD"],
-                capture_output=True, text=False, check=True
-            )
-            head_commit = head_result.stdout.decode('utf-8', errors='replace').strip()
+            head_commit = get_head()
             
-            if commit_id == head_commit or commit_id.startswith(head_commit) or head_commit.startswith(commit_id):
+            if target_commit == head_commit:
                 subprocess.run(
                     ["git", "commit", "--amend", "-m", new_message],
                     check=True
                 )
+                get_head.cache_clear()
             else:
-                # Para commits anteriores, usar rebase interactivo
-                # Crear un script temporal para automatizar el rebase
-                script_content = f"#!/bin/sh\nsed -i '1s/pick/edit/' $1\n"
-                script_path = Path(__file__).parent / "git_rebase_script.sh"
-                
-                with open(script_path, "w") as f:
-                    f.write(script_content)
-                
-                # Hacer el script ejecutable
-                os.chmod(script_path, 0o755)
-                
-                # Iniciar rebase interactivo
-                parent_commit = subprocess.run(
-                    ["git", "rev-parse", f"{commit_id}^"],
-                    capture_output=True, text=True, check=True
-                ).stdout.strip()
-                
-                print("Starting interactive rebase..." if lang == 'es' else "Iniciando rebase interactivo...")
-                subprocess.run(
-                    ["git", "rebase", "-i", "--exec", f"git commit --amend -m '{new_message}' && git rebase --continue", parent_commit],
-                    check=True
-                )
-                
-                # Eliminar el script temporal
-                if script_path.exists():
-                    os.remove(script_path)
+                # Para commits anteriores, crear el commit con el mensaje nuevo y reaplicar los siguientes
+                ok = reword_commit(target_commit, new_message, lang)
+                get_head.cache_clear()
+                if not ok:
+                    return
             
             print("\n✅ Commit message updated successfully!" if lang == 'es' 
                   else "\n✅ ¡Mensaje de commit actualizado correctamente!")
@@ -540,18 +778,11 @@ def edit_commit_manually(commit_id, lang='en'):
         print("Operation failed. Make sure the commit exists and you have permission to modify it." if lang == 'es'
               else "La operación falló. Asegúrate de que el commit existe y tienes permisos para modificarlo.")
 
-def rename_last_commit(api_key, lang='en'):
+def rename_last_commit(get_api_key, lang='en'):
     """Rename the last commit if it hasn't been pushed yet."""
     try:
-        # Check if there are any commits to rename
-        subprocess.run(["git", "log", "-1"], check=True, capture_output=True, text=False)
-        
-        # Get the current commit message
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%B"],
-            capture_output=True, text=False, check=True
-        )
-        old_message = result.stdout.decode('utf-8', errors='replace').strip()
+        # Obtener SHA y mensaje del último commit; falla si no hay commits que renombrar
+        head_commit, _, old_message = head_info()
         
         print("\n" + "="*50)
         print("Last commit message:" if lang == 'es' else "Último mensaje de commit:")
@@ -572,13 +803,6 @@ def rename_last_commit(api_key, lang='en'):
             return
         
         if edit_choice == 'M':
-            # Obtener el ID del último commit
-            head_result = subprocess.run(
-                ["git", "rev-parse", "HEAD"],
-                capture_output=True, text=False, check=True
-            )
-            head_commit = head_result.stdout.decode('utf-8', errors='replace').strip()
-            
             # Editar manualmente
             edit_commit_manually(head_commit, lang)
             return
@@ -590,17 +814,17 @@ def rename_last_commit(api_key, lang='en'):
         try:
             diff = subprocess.run(
                 ["git", "show", "HEAD", "--name-status", "--pretty=format:"],
-                capture_output=True, text=True, check=True
+                capture_output=True, encoding='utf-8', errors='replace', check=True
             ).stdout
         except subprocess.CalledProcessError:
             # Intentar con otro enfoque si el anterior falla
             diff = subprocess.run(
                 ["git", "diff", "HEAD~1", "HEAD"],
-                capture_output=True, text=True, check=True
+                capture_output=True, encoding='utf-8', errors='replace', check=True
             ).stdout
         
-        # Generate message with AI
-        commit_data = generate_commit_message(api_key, diff, lang)
+        # Generate message with AI; la lista de archivos no identifica los cambios, así que no se cachea
+        commit_data = generate_commit_message(get_api_key, diff, lang, use_cache=False)
         
         if not commit_data or not commit_data.get("subject"):
             print("Failed to generate commit message" if lang == 'es' 
@@ -611,37 +835,7 @@ def rename_last_commit(api_key, lang='en'):
         print("\n" + "-" * 50)
         print("\nEditing commit message / Editando mensaje de commit:")
         
-        if lang == 'es':
-            new_type = input(f"\nCommit TYPE [{commit_data['type']}]: ").strip() or commit_data['type']
-            new_scope = input(f"\nCommit SCOPE [{commit_data['scope']}]: ").strip() or commit_data['scope']
-            new_subject = input(f"\nCommit SUBJECT [{commit_data['subject']}]: ").strip() or commit_data['subject']
-            new_body = input(f"\nCommit BODY (use '|' for line breaks)\n[{commit_data['body'].replace('\n', '|')}]: ").strip()
-            new_body = new_body.replace('|', '\n') if new_body else commit_data['body']
-            new_breaking = input(f"\nBREAKING CHANGES [{commit_data['breaking']}]: ").strip() or commit_data['breaking']
-            new_footer = input(f"\nFOOTER [{commit_data['footer']}]: ").strip() or commit_data['footer']
-        else:
-            new_type = input(f"\nTIPO de commit [{commit_data['type']}]: ").strip() or commit_data['type']
-            new_scope = input(f"\nÁMBITO del commit [{commit_data['scope']}]: ").strip() or commit_data['scope']
-            new_subject = input(f"\nASUNTO del commit [{commit_data['subject']}]: ").strip() or commit_data['subject']
-            new_body = input(f"\nCUERPO del commit (usa '|' para saltos de línea)\n[{commit_data['body'].replace('\n', '|')}]: ").strip()
-            new_body = new_body.replace('|', '\n') if new_body else commit_data['body']
-            new_breaking = input(f"\nCAMBIOS DISRUPTIVOS [{commit_data['breaking']}]: ").strip() or commit_data['breaking']
-            new_footer = input(f"\nPIE DE PÁGINA [{commit_data['footer']}]: ").strip() or commit_data['footer']
-        
-        # Formatear el encabezado: tipo(ámbito): asunto
-        header = new_type
-        if new_scope:
-            header += f"({new_scope})"
-        header += f": {new_subject}"
-        
-        # Formatear mensaje completo
-        formatted_message = header
-        if new_body:
-            formatted_message += "\n\n" + new_body
-        if new_breaking:
-            formatted_message += "\n\nBREAKING CHANGE: " + new_breaking
-        if new_footer:
-            formatted_message += "\n\n" + new_footer
+        formatted_message = _format_from_data(edit_commit_fields(commit_data, lang))
         
         print("\n" + "="*50)
         print("New commit message:" if lang == 'es' else "Nuevo mensaje de commit:")
@@ -665,7 +859,42 @@ def rename_last_commit(api_key, lang='en'):
         print("Make sure you have at least one commit to rename." if lang == 'es'
               else "Asegúrate de tener al menos un commit para renombrar.")
 
-def create_new_commit(api_key, lang='en'):
+def _format_from_data(data):
+    """Build the full commit message from a commit data dictionary."""
+    # Encabezado: tipo(ámbito): asunto
+    scope = f"({data['scope']})" if data["scope"] else ""
+    parts = [f"{data['type']}{scope}: {data['subject']}"]
+    if data["body"]:
+        parts.append(data["body"])
+    if data["breaking"]:
+        parts.append("BREAKING CHANGE: " + data["breaking"])
+    if data["footer"]:
+        parts.append(data["footer"])
+    return "\n\n".join(parts)
+
+def _new_commit_menu_text(has_previous, has_next):
+    """Options block of create_new_commit; (P) and (N) only appear when there is a message to go to."""
+    lines = [
+        "\nOptions / Opciones:",
+        "(A) Accept and commit / Aceptar y hacer commit",
+        "(R) Regenerate message / Regenerar mensaje",
+    ]
+    if has_previous:
+        lines.append("(P) Previous message / Mensaje anterior")
+    if has_next:
+        lines.append("(N) Next message / Mensaje siguiente")
+    lines.append("(E) Edit manually / Editar manualmente")
+    lines.append("(C) Cancel / Cancelar")
+    return "\n".join(lines) + "\n"
+
+# Las cuatro variantes del menú (con/sin anterior, con/sin siguiente), construidas una sola vez
+_NEW_COMMIT_MENUS = {
+    (has_previous, has_next): _new_commit_menu_text(has_previous, has_next)
+    for has_previous in (False, True)
+    for has_next in (False, True)
+}
+
+def create_new_commit(get_api_key, lang='en'):
     """Create a new commit with AI-generated message and additional options."""
     # Primero añadir todos los cambios al staging
     stage_changes(all_files=True, lang=lang)
@@ -679,77 +908,41 @@ def create_new_commit(api_key, lang='en'):
     # Historial de mensajes generados
     message_history = []
     current_index = -1
+    generate = True  # Pedir un mensaje a la IA en esta vuelta del bucle
+    regenerate = False  # (R) pide un mensaje nuevo a la IA en lugar de reutilizar el cacheado
     
     while True:
-        # Generate commit message
-        print("Generating commit message..." if lang == 'es' else "Generando mensaje de commit...")
-        commit_data = generate_commit_message(api_key, diff, lang)
-        
-        if not commit_data or not commit_data.get("subject"):
-            print("Failed to generate commit message" if lang == 'es' else "Error al generar el mensaje de commit")
-            return
-        
-        # Si es la primera generación, mantener los campos generados por la IA
-        if current_index < 0:
-            # Guardar en el historial
-            message_history.append(commit_data)
-            current_index = 0
-        else:
-            # Si estamos regenerando, reemplazar todos los mensajes siguientes
-            if current_index < len(message_history) - 1:
-                message_history = message_history[:current_index + 1]
+        if generate:
+            # Generate commit message
+            print("Generating commit message..." if lang == 'es' else "Generando mensaje de commit...")
+            commit_data = generate_commit_message(get_api_key, diff, lang, bust=regenerate)
+            generate = regenerate = False
             
+            if not commit_data or not commit_data.get("subject"):
+                print("Failed to generate commit message" if lang == 'es' else "Error al generar el mensaje de commit")
+                return
+            
+            # Un mensaje nuevo reemplaza todos los mensajes siguientes del historial
+            message_history = message_history[:current_index + 1]
+            commit_data["_formatted"] = _format_from_data(commit_data)
             message_history.append(commit_data)
             current_index = len(message_history) - 1
         
-        # Formatear el mensaje para mostrarlo
+        # Mensaje completo del commit, formateado una sola vez al entrar en el historial
         current_data = message_history[current_index]
-        
-        # Mostrar el mensaje formateado
-        print("\n" + "="*50)
-        print("Commit message:" if lang == 'es' else "Mensaje de commit:")
-        print("-" * 50)
-        
-        # Formatear el encabezado: tipo(ámbito): asunto
-        header = current_data["type"]
-        if current_data["scope"]:
-            header += f"({current_data['scope']})" 
-        header += f": {current_data['subject']}"
-        
-        print(header)
-        
-        if current_data["body"]:
-            print("\n" + current_data["body"])
-        
-        footer_text = ""
-        if current_data["breaking"]:
-            footer_text += f"\n\nBREAKING CHANGE: {current_data['breaking']}"
-        
-        if current_data["footer"]:
-            footer_text += f"\n\n{current_data['footer']}"
-        
-        if footer_text:
-            print(footer_text)
-        
-        print("\n" + "="*50)
-        
-        # Formatear el mensaje completo para el commit
-        formatted_message = header
-        if current_data["body"]:
-            formatted_message += "\n\n" + current_data["body"]
-        if current_data["breaking"]:
-            formatted_message += "\n\nBREAKING CHANGE: " + current_data["breaking"]
-        if current_data["footer"]:
-            formatted_message += "\n\n" + current_data["footer"]
-        
-        # Mostrar opciones
-        print("\nOptions / Opciones:")
-        print("(A) Accept and commit / Aceptar y hacer commit")
-        print("(R) Regenerate message / Regenerar mensaje")
-        print("(P) Previous message / Mensaje anterior" if current_index > 0 else "")
-        print("(N) Next message / Mensaje siguiente" if current_index < len(message_history) - 1 else "")
-        print("(E) Edit manually / Editar manualmente")
-        print("(C) Cancel / Cancelar")
+        formatted_message = current_data["_formatted"]
+        
+        # Mostrar el mensaje formateado y las opciones con una sola escritura
+        menu = _NEW_COMMIT_MENUS[current_index > 0, current_index < len(message_history) - 1]
+        sys.stdout.write(
+            "\n" + "="*50 + "\n"
+            + ("Commit message:" if lang == 'es' else "Mensaje de commit:") + "\n"
+            + "-" * 50 + "\n"
+            + formatted_message + "\n\n"
+            + "="*50 + "\n"
+            + menu
+        )
+        sys.stdout.flush()
         
         choice = input("\nEnter your choice / Ingresa tu opción: ").strip().upper()
         
@@ -763,55 +956,25 @@ def create_new_commit(api_key, lang='en'):
                 break
         
         elif choice == 'R':  # Regenerar mensaje
-            continue  # Volver al inicio del bucle para generar un nuevo mensaje
+            generate = regenerate = True  # Volver al inicio del bucle para generar un nuevo mensaje
         
         elif choice == 'P' and current_index > 0:  # Mensaje anterior
             current_index -= 1
-            formatted_message = message_history[current_index]["formatted"]
         
         elif choice == 'N' and current_index < len(message_history) - 1:  # Mensaje siguiente
             current_index += 1
-            formatted_message = message_history[current_index]["formatted"]
         
         elif choice == 'E':  # Editar manualmente
-            # Obtener los datos actuales para edición
-            current_data = message_history[current_index]
-            
             # Permitir al usuario editar cada campo
             print("\n" + "-" * 50)
             print("\nEditing commit message / Editando mensaje de commit:")
             
-            if lang == 'es':
-                new_type = input(f"\nCommit TYPE [{current_data['type']}]: ").strip() or current_data['type']
-                new_scope = input(f"\nCommit SCOPE [{current_data['scope']}]: ").strip() or current_data['scope']
-                new_subject = input(f"\nCommit SUBJECT [{current_data['subject']}]: ").strip() or current_data['subject']
-                new_body = input(f"\nCommit BODY (use '|' for line breaks)\n[{current_data['body'].replace('\n', '|')}]: ").strip()
-                new_body = new_body.replace('|', '\n') if new_body else current_data['body']
-                new_breaking = input(f"\nBREAKING CHANGES [{current_data['breaking']}]: ").strip() or current_data['breaking']
-                new_footer = input(f"\nFOOTER [{current_data['footer']}]: ").strip() or current_data['footer']
-            else:
-                new_type = input(f"\nTIPO de commit [{current_data['type']}]: ").strip() or current_data['type']
-                new_scope = input(f"\nÁMBITO del commit [{current_data['scope']}]: ").strip() or current_data['scope']
-                new_subject = input(f"\nASUNTO del commit [{current_data['subject']}]: ").strip() or current_data['subject']
-                new_body = input(f"\nCUERPO del commit (usa '|' para saltos de línea)\n[{current_data['body'].replace('\n', '|')}]: ").strip()
-                new_body = new_body.replace('|', '\n') if new_body else current_data['body']
-                new_breaking = input(f"\nCAMBIOS DISRUPTIVOS [{current_data['breaking']}]: ").strip() or current_data['breaking']
-                new_footer = input(f"\nPIE DE PÁGINA [{current_data['footer']}]: ").strip() or current_data['footer']
-            
             # Crear un nuevo objeto de datos de commit con los valores editados
-            edited_data = {
-                "type": new_type,
-                "scope": new_scope,
-                "subject": new_subject,
-                "body": new_body,
-                "breaking": new_breaking,
-                "footer": new_footer
-            }
+            edited_data = edit_commit_fields(current_data, lang)
+            edited_data["_formatted"] = _format_from_data(edited_data)
             
             # Añadir al historial
-            if current_index < len(message_history) - 1:
-                message_history = message_history[:current_index + 1]
-            
+            message_history = message_history[:current_index + 1]
             message_history.append(edited_data)
             current_index = len(message_history) - 1
         
@@ -822,24 +985,26 @@ def create_new_commit(api_key, lang='en'):
         else:
             print("Invalid option. Please try again." if lang == 'es' else "Opción inválida. Inténtalo de nuevo.")
 
-def edit_specific_commit(api_key, lang='en'):
+def edit_specific_commit(get_api_key, lang='en'):
     """Edit a specific commit by its ID."""
     # Mostrar los últimos commits para referencia
     print("\nShowing last 10 commits for reference:" if lang == 'es' else "\nMostrando los últimos 10 commits como referencia:")
-    subprocess.run(
-        ["git", "log", "--oneline", "-n", "10"],
-        check=True
-    )
+    try:
+        recent = load_recent_commits(10)
+    except subprocess.CalledProcessError:
+        recent = []
+    if recent:
+        print("\n".join(c["oneline"] for c in recent))
     
     # Solicitar ID del commit
-    commit_id = input("\nEnter commit ID / Ingresa el ID del commit: ").strip()
+    commit_id = prompt("\nEnter commit ID / Ingresa el ID del commit: ").strip()
     
     if not commit_id:
         print("Operation cancelled." if lang == 'es' else "Operación cancelada.")
         return
     
     # Obtener información del commit
-    commit_info = get_commit_by_id(commit_id, lang)
+    commit_info = get_commit_by_id(commit_id, lang, recent)
     
     if not commit_info:
         return
@@ -850,7 +1015,7 @@ def edit_specific_commit(api_key, lang='en'):
     print("(M) Manual edit / Edición manual")
     print("(C) Cancel / Cancelar")
     
-    edit_choice = input("\nEnter your choice / Ingresa tu opción: ").strip().upper()
+    edit_choice = prompt("\nEnter your choice / Ingresa tu opción: ").strip().upper()
     
     if edit_choice == 'C':
         print("Operation cancelled." if lang == 'es' else "Operación cancelada.")
@@ -864,7 +1029,8 @@ def edit_specific_commit(api_key, lang='en'):
     # Edición asistida por IA
     # Generate message with AI
     print("\nGenerating new commit message..." if lang == 'es' else "\nGenerando nuevo mensaje de commit...")
-    commit_data = generate_commit_message(api_key, commit_info["diff"], lang)
+    # La lista de archivos (--name-status) no identifica los cambios, así que no se cachea
+    commit_data = generate_commit_message(get_api_key, commit_info["diff"], lang, use_cache=False)
     
     if not commit_data or not commit_data.get("subject"):
         print("Failed to generate commit message" if lang == 'es' 
@@ -875,37 +1041,7 @@ def edit_specific_commit(api_key, lang='en'):
     print("\n" + "-" * 50)
     print("\nEditing commit message / Editando mensaje de commit:")
     
-    if lang == 'es':
-        new_type = input(f"\nCommit TYPE [{commit_data['type']}]: ").strip() or commit_data['type']
-        new_scope = input(f"\nCommit SCOPE [{commit_data['scope']}]: ").strip() or commit_data['scope']
-        new_subject = input(f"\nCommit SUBJECT [{commit_data['subject']}]: ").strip() or commit_data['subject']
-        new_body = input(f"\nCommit BODY (use '|' for line breaks)\n[{commit_data['body'].replace('\n', '|')}]: ").strip()
-        new_body = new_body.replace('|', '\n') if new_body else commit_data['body']
-        new_breaking = input(f"\nBREAKING CHANGES [{commit_data['breaking']}]: ").strip() or commit_data['breaking']
-        new_footer = input(f"\nFOOTER [{commit_data['footer']}]: ").strip() or commit_data['footer']
-    else:
-        new_type = input(f"\nTIPO de commit [{commit_data['type']}]: ").strip() or commit_data['type']
-        new_scope = input(f"\nÁMBITO del commit [{commit_data['scope']}]: ").strip() or commit_data['scope']
-        new_subject = input(f"\nASUNTO del commit [{commit_data['subject']}]: ").strip() or commit_data['subject']
-        new_body = input(f"\nCUERPO del commit (usa '|' para saltos de línea)\n[{commit_data['body'].replace('\n', '|')}]: ").strip()
-        new_body = new_body.replace('|', '\n') if new_body else commit_data['body']
-        new_breaking = input(f"\nCAMBIOS DISRUPTIVOS [{commit_data['breaking']}]: ").strip() or commit_data['breaking']
-        new_footer = input(f"\nPIE DE PÁGINA [{commit_data['footer']}]: ").strip() or commit_data['footer']
-    
-    # Formatear el encabezado: tipo(ámbito): asunto
-    header = new_type
-    if new_scope:
-        header += f"({new_scope})"
-    header += f": {new_subject}"
-    
-    # Formatear mensaje completo
-    formatted_message = header
-    if new_body:
-        formatted_message += "\n\n" + new_body
-    if new_breaking:
-        formatted_message += "\n\nBREAKING CHANGE: " + new_breaking
-    if new_footer:
-        formatted_message += "\n\n" + new_footer
+    formatted_message = _format_from_data(edit_commit_fields(commit_data, lang))
     
     print("\n" + "="*50)
     print("New commit message:" if lang == 'es' else "Nuevo mensaje de commit:")
@@ -914,69 +1050,55 @@ def edit_specific_commit(api_key, lang='en'):
     print("="*50)
     
     # Ask for confirmation
-    confirm = input("\nApply this change? (y/n): " if lang == 'es' 
+    confirm = prompt("\nApply this change? (y/n): " if lang == 'es' 
                  else "¿Aplicar este cambio? (s/n): ").strip().lower()
     
     if confirm in ['y', 's']:
-        # Si es el último commit, usar --amend
-        head_commit = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            capture_output=True, text=True, check=True
-        ).stdout.strip()
-        
-        if commit_id == head_commit or commit_id.startswith(head_commit) or head_commit.startswith(commit_id):
-            subprocess.run(
-                ["git", "commit", "--amend", "-m", formatted_message],
-                check=True
-            )
-        else:
-            # Para commits anteriores, usar rebase interactivo
-            # Crear un script temporal para automatizar el rebase
-            script_content = f"#!/bin/sh\nsed -i '1s/pick/edit/' $1\n"
-            script_path = Path(__file__).parent / "git_rebase_script.sh"
-            
-            with open(script_path, "w") as f:
-                f.write(script_content)
-            
-            # Hacer el script ejecutable
-            os.chmod(script_path, 0o755)
-            
-            # Iniciar rebase interactivo
-            parent_result = subprocess.run(
-                ["git", "rev-parse", f"{commit_id}^"],
-                capture_output=True, text=False, check=True
-            )
-            parent_commit = parent_result.stdout.decode('utf-8', errors='replace').strip()
+        try:
+            # Si es el último commit, usar --amend; HEAD y el SHA completo salen de una sola llamada
+            head_commit, target_commit, _ = resolve_commit_and_head(commit_id)
             
-            print("Starting interactive rebase..." if lang == 'es' else "Iniciando rebase interactivo...")
-            subprocess.run(
-                ["git", "rebase", "-i", "--exec", f"git commit --amend -m '{formatted_message}' && git rebase --continue", parent_commit],
-                check=True
-            )
+            if target_commit == head_commit:
+                subprocess.run(
+                    ["git", "commit", "--amend", "-m", formatted_message],
+                    check=True
+                )
+                get_head.cache_clear()
+            else:
+                # Para commits anteriores, crear el commit con el mensaje nuevo y reaplicar los siguientes
+                ok = reword_commit(target_commit, formatted_message, lang)
+                get_head.cache_clear()
+                if not ok:
+                    return
             
-            # Eliminar el script temporal
-            if script_path.exists():
-                os.remove(script_path)
-        
-        print("\n✅ Commit message updated successfully!" if lang == 'es' 
-              else "\n✅ ¡Mensaje de commit actualizado correctamente!")
+            print("\n✅ Commit message updated successfully!" if lang == 'es' 
+                  else "\n✅ ¡Mensaje de commit actualizado correctamente!")
+        except subprocess.CalledProcessError as e:
+            print(f"Error: {e}")
+            print("Operation failed. Make sure the commit exists and you have permission to modify it." if lang == 'es'
+                  else "La operación falló. Asegúrate de que el commit existe y tienes permisos para modificarlo.")
 
-def main_ai_commit():
-    # Load environment variables
-    env_path = Path(__file__).parent / '.env'
-    if not env_path.exists():
+@functools.lru_cache(maxsize=1)
+def load_api_key():
+    """Read QWEN_API_KEY from the .env next to the script the first time it is needed; None if missing."""
+    # Load environment variables (abrir directamente, sin comprobar antes si existe)
+    try:
+        with open(HERE / '.env', encoding='utf-8') as env_file:
+            load_dotenv(stream=env_file)
+    except FileNotFoundError:
         print("Error: .env file not found. Please create it with your Qwen API key.")
         print("Example .env file content:")
         print("QWEN_API_KEY=your_api_key_here")
-        return
-        
-    load_dotenv(env_path)
+        return None
+    
     api_key = os.getenv("QWEN_API_KEY")
     
     if not api_key:
         print("Error: QWEN_API_KEY not found in .env file")
-        return
-    
+        return None
+    return api_key
+
+def main_ai_commit():
     # Get language choice
     lang = get_language_choice()
     
@@ -993,29 +1115,57 @@ def main_ai_commit():
         print("Invalid choice. Please enter 1, 2, or 3." if lang == 'es' else "Opción inválida. Por favor, ingresa 1, 2 o 3.")
     
     if choice == '2':
-        rename_last_commit(api_key, lang)
+        rename_last_commit(load_api_key, lang)
     elif choice == '3':
-        edit_specific_commit(api_key, lang)
+        edit_specific_commit(load_api_key, lang)
     else:
-        create_new_commit(api_key, lang)
+        create_new_commit(load_api_key, lang)
+
+def _git_display(*args):
+    """Run `git <args>` and return its stdout and stderr for printing, keeping colors when on a terminal."""
+    color = ["-c", "color.ui=always"] if sys.stdout.isatty() else []
+    result = subprocess.run(
+        ["git", *color, *args],
+        capture_output=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    return result.stdout + result.stderr
 
 def show_status(lang: str = 'en') -> None:
     """Show the current status of the repository."""
     print("\n" + ("=== Repository Status ===" if lang == 'es' else "=== Estado del Repositorio ==="))
-    commands = []
+    commands = ["git status", "git branch -v"]
     
-    # Git status
-    commands.append("git status")
-    subprocess.run(["git", "status"])
-    
-    # Show branch information
-    commands.append("git branch -v")
-    subprocess.run(["git", "branch", "-v"])
+    # Las dos lecturas son independientes: se lanzan a la vez y se muestran en orden
+    status_future = _pool.submit(_git_display, "status")
+    branches_future = _pool.submit(_git_display, "branch", "-v")
+    sys.stdout.write(status_future.result())
+    sys.stdout.write(branches_future.result())
     
     print("\n" + ("=== Commands executed ===" if lang == 'es' else "=== Comandos ejecutados ==="))
     for cmd in commands:
         print(f"$ {cmd}")
 
+def _git_paths(args: List[str], files: List[str]) -> int:
+    """Run `git <args> -- <files>` once and return how many files it applied to.
+    
+    A single path that does not match makes git reject the whole command, so on failure each
+    file is retried on its own and git's error is printed for the ones that still fail.
+    """
+    result = subprocess.run(["git", *args, "--", *files], stderr=subprocess.PIPE, encoding='utf-8', errors='replace')
+    if result.returncode == 0:
+        return len(files)
+    
+    done = 0
+    for file in files:
+        result = subprocess.run(["git", *args, "--", file], stderr=subprocess.PIPE, encoding='utf-8', errors='replace')
+        if result.returncode == 0:
+            done += 1
+        else:
+            sys.stderr.write(result.stderr)
+    return done
+
 def stage_changes(files: List[str] = None, all_files: bool = False, lang: str = 'en') -> None:
     """Stage changes in the working directory."""
     commands = []
@@ -1026,11 +1176,11 @@ def stage_changes(files: List[str] = None, all_files: bool = False, lang: str =
         print("\n" + ("All changes staged successfully!" if lang == 'es' 
                        else "¡Todos los cambios añadidos al área de preparación!"))
     elif files:
-        for file in files:
-            commands.append(f"git add {file}")
-            subprocess.run(["git", "add", file])
-        print("\n" + (f"Staged {len(files)} files successfully!" if lang == 'es' 
-                         else f"¡{len(files)} archivos añadidos al área de preparación!"))
+        # Un solo `git add` para todos los archivos: un proceso y una escritura del índice
+        commands.append("git add -- " + " ".join(shlex.quote(file) for file in files))
+        staged = _git_paths(["add"], files)
+        print("\n" + (f"Staged {staged} of {len(files)} files." if lang == 'es' 
+                         else f"{staged} de {len(files)} archivos añadidos al área de preparación."))
     else:
         print("\n" + ("No files specified to stage. Use --all to stage all changes." 
                        if lang == 'es' else "No se especificaron archivos. Usa --all para añadir todos los cambios."))
@@ -1050,11 +1200,11 @@ def unstage_changes(files: List[str] = None, all_files: bool = False, lang: str
         print("\n" + ("All changes unstaged successfully!" if lang == 'es' 
                        else "¡Todos los cambios eliminados del área de preparación!"))
     elif files:
-        for file in files:
-            commands.append(f"git restore --staged {file}")
-            subprocess.run(["git", "restore", "--staged", file])
-        print("\n" + (f"Unstaged {len(files)} files successfully!" if lang == 'es' 
-                         else f"¡{len(files)} archivos eliminados del área de preparación!"))
+        # Un solo `git restore` para todos los archivos
+        commands.append("git restore --staged -- " + " ".join(shlex.quote(file) for file in files))
+        unstaged = _git_paths(["restore", "--staged"], files)
+        print("\n" + (f"Unstaged {unstaged} of {len(files)} files." if lang == 'es' 
+                         else f"{unstaged} de {len(files)} archivos eliminados del área de preparación."))
     else:
         print("\n" + ("No files specified to unstage. Use --all to unstage all changes." 
                        if lang == 'es' else "No se especificaron archivos. Usa --all para quitar todos los cambios."))
@@ -1074,14 +1224,14 @@ def create_branch(branch_name: str, switch: bool = False, lang: str = 'en') -> N
     
     if switch:
         commands.append(f"git checkout -b {branch_name}")
-        result = subprocess.run(["git", "checkout", "-b", branch_name], capture_output=True, text=True)
+        result = subprocess.run(["git", "checkout", "-b", branch_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error creating branch: {result.stderr}" if lang == 'es' 
                            else f"Error al crear la rama: {result.stderr}"))
             return
     else:
         commands.append(f"git branch {branch_name}")
-        result = subprocess.run(["git", "branch", branch_name], capture_output=True, text=True)
+        result = subprocess.run(["git", "branch", branch_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error creating branch: {result.stderr}" if lang == 'es' 
                            else f"Error al crear la rama: {result.stderr}"))
@@ -1104,10 +1254,10 @@ def switch_branch(branch_name: str, create: bool = False, lang: str = 'en') -> N
     
     if create:
         commands.append(f"git checkout -b {branch_name}")
-        result = subprocess.run(["git", "checkout", "-b", branch_name], capture_output=True, text=True)
+        result = subprocess.run(["git", "checkout", "-b", branch_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     else:
         commands.append(f"git checkout {branch_name}")
-        result = subprocess.run(["git", "checkout", branch_name], capture_output=True, text=True)
+        result = subprocess.run(["git", "checkout", branch_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     
     if result.returncode != 0:
         print("\n" + (f"Error switching branch: {result.stderr}" if lang == 'es' 
@@ -1135,28 +1285,62 @@ def list_branches(lang: str = 'en') -> None:
     for cmd in commands:
         print(f"$ {cmd}")
 
-def push_changes(remote: str = "origin", branch: str = None, setUpstream: bool = False, lang: str = 'en') -> None:
-    """Push changes to a remote repository."""
+def current_branch():
+    """Return the name of the current branch ("HEAD" if detached), or None outside a repository."""
+    # Sin caché: el script resuelve la rama una sola vez por ejecución, así que basta una consulta
+    repo = _pygit2_repo(os.getcwd())
+    if repo is not None:
+        try:
+            return "HEAD" if repo.head_is_detached else repo.head.shorthand
+        except pygit2.GitError:
+            pass
+    try:
+        return _git("rev-parse", "--abbrev-ref", "HEAD")
+    except subprocess.CalledProcessError:
+        return None
+
+def exec_git(command: List[str], commands: List[str], lang: str = 'en') -> None:
+    """Print the command summary and replace this process with git (os.execvp); does not return.
+    
+    On Windows, where exec does not replace the process, git runs as a child and its exit status is kept.
+    """
+    print("\n" + ("=== Commands executed ===" if lang == 'es' else "=== Comandos ejecutados ==="))
+    for cmd in commands:
+        print(f"$ {cmd}")
+    sys.stdout.flush()
+    
+    if os.name == 'nt':
+        sys.exit(subprocess.run(command).returncode)
+    # atexit no se ejecuta tras exec: cerrar a mano el proceso de cat-file
+    close_cat_file()
+    os.execvp(command[0], command)
+
+def push_changes(remote: str = "origin", branch: str = None, setUpstream: bool = False, lang: str = 'en',
+                 exec_last: bool = False) -> None:
+    """Push changes to a remote repository.
+    
+    With exec_last, git replaces this process and shows its own output (see exec_git).
+    """
     commands = []
     
     if not branch:
         # Get current branch name
-        result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
-                              capture_output=True, text=True)
-        if result.returncode != 0:
+        branch = current_branch()
+        if not branch:
             print("\n" + ("Error getting current branch name!" if lang == 'es' 
                           else "¡Error al obtener el nombre de la rama actual!"))
             return
-        branch = result.stdout.strip()
     
     if setUpstream:
         commands.append(f"git push -u {remote} {branch}")
-        result = subprocess.run(["git", "push", "-u", remote, branch], 
-                              capture_output=True, text=True)
+        push_cmd = ["git", "push", "-u", remote, branch]
     else:
         commands.append(f"git push {remote} {branch}")
-        result = subprocess.run(["git", "push", remote, branch], 
-                              capture_output=True, text=True)
+        push_cmd = ["git", "push", remote, branch]
+    
+    if exec_last:
+        exec_git(push_cmd, commands, lang)
+    result = subprocess.run(push_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     
     if result.returncode != 0:
         print("\n" + (f"Error pushing changes: {result.stderr}" if lang == 'es' 
@@ -1170,28 +1354,32 @@ def push_changes(remote: str = "origin", branch: str = None, setUpstream: bool =
     for cmd in commands:
         print(f"$ {cmd}")
 
-def pull_changes(remote: str = "origin", branch: str = None, rebase: bool = False, lang: str = 'en') -> None:
-    """Pull changes from a remote repository."""
+def pull_changes(remote: str = "origin", branch: str = None, rebase: bool = False, lang: str = 'en',
+                 exec_last: bool = False) -> None:
+    """Pull changes from a remote repository.
+    
+    With exec_last, git replaces this process and shows its own output (see exec_git).
+    """
     commands = []
     
     if not branch:
         # Get current branch name
-        result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
-                              capture_output=True, text=True)
-        if result.returncode != 0:
+        branch = current_branch()
+        if not branch:
             print("\n" + ("Error getting current branch name!" if lang == 'es' 
                           else "¡Error al obtener el nombre de la rama actual!"))
             return
-        branch = result.stdout.strip()
     
     if rebase:
         commands.append(f"git pull --rebase {remote} {branch}")
-        result = subprocess.run(["git", "pull", "--rebase", remote, branch], 
-                              capture_output=True, text=True)
+        pull_cmd = ["git", "pull", "--rebase", remote, branch]
     else:
         commands.append(f"git pull {remote} {branch}")
-        result = subprocess.run(["git", "pull", remote, branch], 
-                              capture_output=True, text=True)
+        pull_cmd = ["git", "pull", remote, branch]
+    
+    if exec_last:
+        exec_git(pull_cmd, commands, lang)
+    result = subprocess.run(pull_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     
     if result.returncode != 0:
         print("\n" + (f"Error pulling changes: {result.stderr}" if lang == 'es' 
@@ -1217,7 +1405,7 @@ def stash_changes(message: str = "", pop: bool = False, apply: bool = False, lis
     
     if pop:
         commands.append("git stash pop")
-        result = subprocess.run(["git", "stash", "pop"], capture_output=True, text=True)
+        result = subprocess.run(["git", "stash", "pop"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error applying stash: {result.stderr}" if lang == 'es' 
                           else f"Error al aplicar los cambios guardados: {result.stderr}"))
@@ -1226,7 +1414,7 @@ def stash_changes(message: str = "", pop: bool = False, apply: bool = False, lis
                          else "¡Cambios aplicados exitosamente!"))
     elif apply:
         commands.append("git stash apply")
-        result = subprocess.run(["git", "stash", "apply"], capture_output=True, text=True)
+        result = subprocess.run(["git", "stash", "apply"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error applying stash: {result.stderr}" if lang == 'es' 
                           else f"Error al aplicar los cambios guardados: {result.stderr}"))
@@ -1241,7 +1429,7 @@ def stash_changes(message: str = "", pop: bool = False, apply: bool = False, lis
         else:
             commands.append("git stash save")
         
-        result = subprocess.run(stash_cmd, capture_output=True, text=True)
+        result = subprocess.run(stash_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error stashing changes: {result.stderr}" if lang == 'es' 
                           else f"Error al guardar los cambios temporalmente: {result.stderr}"))
@@ -1260,7 +1448,7 @@ def undo_last_commit(keep_changes: bool = True, lang: str = 'en') -> None:
     if keep_changes:
         commands.append("git reset --soft HEAD~1")
         result = subprocess.run(["git", "reset", "--soft", "HEAD~1"], 
-                              capture_output=True, text=True)
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error undoing last commit: {result.stderr}" if lang == 'es' 
                           else f"Error al deshacer el último commit: {result.stderr}"))
@@ -1277,7 +1465,7 @@ def undo_last_commit(keep_changes: bool = True, lang: str = 'en') -> None:
             return
         
         result = subprocess.run(["git", "reset", "--hard", "HEAD~1"], 
-                              capture_output=True, text=True)
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             print("\n" + (f"Error undoing last commit: {result.stderr}" if lang == 'es' 
                           else f"Error al deshacer el último commit: {result.stderr}"))
@@ -1300,8 +1488,8 @@ Git Helper - Comandos disponibles / Available commands:
     - unstage [archivos...] --all: Quita archivos del área de preparación / Remove files from staging area
 
 2.  Sincronización / Synchronization:
-    - push [rama] --set-upstream: Envía cambios al repositorio remoto / Push changes to remote repository
-    - pull [rama] --rebase: Obtiene cambios del repositorio remoto / Pull changes from remote repository
+    - push [rama] --set-upstream [--exec-last]: Envía cambios al repositorio remoto / Push changes to remote repository
+    - pull [rama] --rebase [--exec-last]: Obtiene cambios del repositorio remoto / Pull changes from remote repository
 
 3.  Gestión de ramas / Branch Management:
     - branch: Lista todas las ramas / List all branches
@@ -1322,8 +1510,9 @@ Ejemplos / Examples:
 """
     print(help_text)
 
-def parse_arguments():
-    """Parse command line arguments."""
+@functools.lru_cache(maxsize=None)
+def build_parser():
+    """Build the command line parser once; argparse is only imported when there are arguments to parse."""
     import argparse
     
     parser = argparse.ArgumentParser(description='Git Helper - Herramienta de ayuda para Git')
@@ -1347,12 +1536,16 @@ def parse_arguments():
     push_parser.add_argument('branch', nargs='?', help='Rama a la que hacer push / Branch to push to')
     push_parser.add_argument('--set-upstream', '-u', action='store_true', 
                            help='Establece la rama de seguimiento / Set upstream branch')
+    push_parser.add_argument('--exec-last', action='store_true',
+                           help='Termina ejecutando git directamente, con su propia salida / Hand the process over to git, showing its own output')
     
     # Pull command
     pull_parser = subparsers.add_parser('pull', help='Obtiene cambios del repositorio remoto / Pull changes from remote')
     pull_parser.add_argument('branch', nargs='?', help='Rama de la que hacer pull / Branch to pull from')
     pull_parser.add_argument('--rebase', action='store_true', 
                            help='Realiza un rebase al hacer pull / Perform a rebase when pulling')
+    pull_parser.add_argument('--exec-last', action='store_true',
+                           help='Termina ejecutando git directamente, con su propia salida / Hand the process over to git, showing its own output')
     
     # Branch command
     branch_parser = subparsers.add_parser('branch', help='Lista todas las ramas / List all branches')
@@ -1392,7 +1585,11 @@ def parse_arguments():
     parser.add_argument('--lang', choices=['en', 'es'], default='en',
                       help='Idioma / Language (en/es)')
     
-    return parser.parse_args()
+    return parser
+
+def parse_arguments():
+    """Parse command line arguments."""
+    return build_parser().parse_args()
 
 def main():
     """Main function to handle command execution."""
@@ -1425,10 +1622,10 @@ def main():
                 unstage_changes(files=args.files, lang=lang)
                 
         elif args.command == 'push':
-            push_changes(branch=args.branch, setUpstream=args.set_upstream, lang=lang)
+            push_changes(branch=args.branch, setUpstream=args.set_upstream, lang=lang, exec_last=args.exec_last)
             
         elif args.command == 'pull':
-            pull_changes(branch=args.branch, rebase=args.rebase, lang=lang)
+            pull_changes(branch=args.branch, rebase=args.rebase, lang=lang, exec_last=args.exec_last)
             
         elif args.command == 'branch':
             list_branches(lang)